@@ -0,0 +1,61 @@
+"""Measure how fast pytest-localstack creates botocore clients.
+
+Clients are created from a :class:`.RunningSession`, so no Localstack
+container is needed. Run from the repository root::
+
+    python benchmarks/create_client.py [--clients N] [--threads N]
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from pytest_localstack import session  # noqa: E402
+
+SERVICES = ["s3", "sqs", "sts", "dynamodb"]
+
+
+def create_clients(botocore_session, n):
+    for i in range(n):
+        botocore_session.create_client(
+            SERVICES[i % len(SERVICES)], region_name="us-east-1"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    localstack = session.RunningSession("127.0.0.1", region_name="us-east-1")
+    botocore_session = localstack.botocore.session()
+    # Load the service models before timing.
+    create_clients(botocore_session, len(SERVICES))
+
+    start_time = time.perf_counter()
+    create_clients(botocore_session, args.clients)
+    elapsed = time.perf_counter() - start_time
+    print("1 thread:   %8.0f clients/s" % (args.clients / elapsed))
+
+    per_thread = args.clients // args.threads
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as executor:
+        start_time = time.perf_counter()
+        futures = [
+            executor.submit(create_clients, botocore_session, per_thread)
+            for _ in range(args.threads)
+        ]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start_time
+    print(
+        "%i threads: %8.0f clients/s"
+        % (args.threads, per_thread * args.threads / elapsed)
+    )
+
+
+if __name__ == "__main__":
+    main()
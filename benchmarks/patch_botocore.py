@@ -0,0 +1,69 @@
+"""Compare the overhead of the patch_botocore() modes.
+
+A client created before patching makes API calls against a fake
+Localstack that answers every request with an empty S3 bucket list,
+so no container is needed. Run from the repository root::
+
+    python benchmarks/patch_botocore.py [--calls N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import botocore.session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from pytest_localstack import session  # noqa: E402
+from tests import utils as test_utils  # noqa: E402
+
+LIST_BUCKETS_RESPONSE = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<ListAllMyBucketsResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+    b"<Owner><ID>id</ID><DisplayName>name</DisplayName></Owner>"
+    b"<Buckets></Buckets></ListAllMyBucketsResult>"
+)
+
+
+def measure(localstack, client, mode, calls):
+    with localstack.botocore.patch_botocore(mode=mode):
+        client.list_buckets()  # Create the Localstack client before timing.
+
+        start_time = time.perf_counter()
+        for _ in range(calls * 100):
+            client.meta
+        attribute_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _ in range(calls):
+            client.list_buckets()
+        call_time = time.perf_counter() - start_time
+    print(
+        "%-8s %8.0f calls/s %10.0f attribute reads/s"
+        % (mode, calls / call_time, calls * 100 / attribute_time)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args()
+
+    routes = {("GET", None): lambda path: (200, LIST_BUCKETS_RESPONSE)}
+    with test_utils.fake_http_server(routes) as port:
+        localstack = session.RunningSession(
+            "127.0.0.1", region_name="us-east-1", edge_port=port
+        )
+        client = botocore.session.get_session().create_client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="key",
+            aws_secret_access_key="secret",
+        )
+        for mode in ("proxy", "events"):
+            measure(localstack, client, mode, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,223 @@
+import collections
+import concurrent.futures
 import contextlib
 import logging
+import os
 import sys
+import tempfile
+import threading
 
-import docker
 import pytest
 
-from pytest_localstack import constants, plugin, session, utils
+from pytest_localstack import constants, container, plugin, pool, utils
 from pytest_localstack._version import __version__  # noqa: F401
 
+logger = logging.getLogger(__name__)
+
 _start_timeout = None
 _stop_timeout = None
+_pool = None
+_reset_pool = None
+_shared = None
+_reaper = None
+_reused = None
+_worker_id = None
+_owner_pid = None
+_remove_orphans = True
+_orphans_removed = False
+_orphans_lock = threading.Lock()
+_pull_policy = None
+_image_pull_times = {}
+_timelines = collections.OrderedDict()
+_declared_sessions = collections.OrderedDict()
+_prestarted = {}
+
+# pytest cache key for when images were last pulled.
+_IMAGE_PULL_TIMES_KEY = "localstack/image_pull_times"
 
 
 def pytest_configure(config):
-    global _start_timeout, _stop_timeout
+    global _start_timeout, _stop_timeout, _pool, _reset_pool, _reaper
+    global _pull_policy, _image_pull_times, _owner_pid, _remove_orphans
+    global _reused, _worker_id
+    if config.getoption("--localstack-reuse"):
+        # Reused containers are never pooled, shared or prestarted.
+        conflicting = [
+            option
+            for option in (
+                "--localstack-pool",
+                "--localstack-prestart",
+                "--localstack-share",
+            )
+            if config.getoption(option)
+        ]
+        if conflicting:
+            raise pytest.UsageError(
+                "--localstack-reuse can't be combined with " + ", ".join(conflicting)
+            )
+        if config.getoption("--localstack-reuse-idle-ttl") <= 0:
+            raise pytest.UsageError("--localstack-reuse-idle-ttl must be positive")
     _start_timeout = config.getoption("--localstack-start-timeout")
     _stop_timeout = config.getoption("--localstack-stop-timeout")
+    _pull_policy = config.getoption("--localstack-pull-policy")
+    if _pull_policy is not None:
+        from pytest_localstack import session
+
+        try:
+            session.parse_pull_policy(_pull_policy)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+    if getattr(config, "cache", None) is not None:
+        _image_pull_times = config.cache.get(_IMAGE_PULL_TIMES_KEY, {})
+    if config.getoption("--localstack-pool"):
+        _pool = pool.SessionPool()
+    _reset_pool = pool.SessionPool()
+    if config.getoption("--localstack-async-teardown"):
+        _reaper = container.ContainerReaper()
+    # pytest-xdist workers are children of the controller process,
+    # which outlives them.
+    _owner_pid = os.getppid() if hasattr(config, "workerinput") else os.getpid()
+    _remove_orphans = config.getoption("localstack_reap")
+    if config.getoption("--localstack-reuse"):
+        from pytest_localstack import reuse
+
+        _reused = reuse.ReusedSessions(
+            idle_ttl=config.getoption("--localstack-reuse-idle-ttl")
+        )
+        _worker_id = getattr(config, "workerinput", {}).get("workerid")
+
+
+def pytest_sessionstart(session):
+    global _shared
+    workerinput = getattr(session.config, "workerinput", None)
+    if session.config.getoption("--localstack-share") and workerinput is not None:
+        # Every worker of a pytest-xdist run gets the same run id.
+        directory = os.path.join(
+            tempfile.gettempdir(),
+            "pytest-localstack",
+            "share-%s" % workerinput["testrunuid"],
+        )
+        os.makedirs(directory, exist_ok=True)
+        from pytest_localstack import shared
+
+        _shared = shared.SharedSessions(directory)
+    elif session.config.getoption("--localstack-prestart"):
+        if not _is_xdist_controller(session.config):
+            _prestart_sessions()
+
+
+def _is_xdist_controller(config):
+    """Return True if this process only hands out tests to pytest-xdist workers."""
+    return bool(getattr(config.option, "numprocesses", None)) and not hasattr(
+        config, "workerinput"
+    )
+
+
+def pytest_sessionfinish(session):
+    if _reaper is not None:
+        # Wait for the containers of this test run to stop.
+        _reaper.drain()
+
+
+def pytest_unconfigure(config):
+    global _pool, _reset_pool, _shared, _reaper, _reused
+    if getattr(config, "cache", None) is not None and _image_pull_times:
+        config.cache.set(_IMAGE_PULL_TIMES_KEY, _image_pull_times)
+    # Stop the remaining containers concurrently.
+    reaper = _reaper if _reaper is not None else container.ContainerReaper()
+    if _pool is not None:
+        _pool.close(timeout=_stop_timeout, reaper=reaper)
+        _pool = None
+    if _reset_pool is not None:
+        _reset_pool.close(timeout=_stop_timeout, reaper=reaper)
+        _reset_pool = None
+    if _shared is not None:
+        _shared.close(timeout=_stop_timeout, reaper=reaper)
+        _shared = None
+    if _reused is not None:
+        # Reused containers keep running, so there is nothing to wait for.
+        _reused.close(timeout=_stop_timeout)
+        _reused = None
+    for prestarted in _prestarted.values():
+        # Started, but never used by a fixture.
+        if prestarted.exception() is None:
+            prestarted.result().stop(timeout=_stop_timeout, reaper=reaper)
+    _prestarted.clear()
+    reaper.close()
+    _reaper = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    outcome = yield
+    if outcome.excinfo is not None:
+        return
+    result = outcome.get_result()
+    # Nothing can have made a session if the module was never imported.
+    session = sys.modules.get("pytest_localstack.session")
+    if session is not None and isinstance(result, session.RunningSession):
+        timelines = _timelines.setdefault(fixturedef.argname, [])
+        # Pooled and shared sessions are only started once.
+        if not any(t is result.timeline for t in timelines):
+            timelines.append(result.timeline)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if not report.failed:
+        return
+    # Add the buffered container logs of the test's sessions.
+    for argname, value in getattr(item, "funcargs", {}).items():
+        container_logs = getattr(value, "container_logs", None)
+        if container_logs:
+            report.sections.append(
+                (
+                    "Captured localstack logs %s (%s)" % (report.when, argname),
+                    "\n".join(container_logs.lines()),
+                )
+            )
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Summarize how long Localstack sessions took to start."""
+    _write_startup_times(terminalreporter)
+    plugin.manager.hook.terminal_summary(terminalreporter=terminalreporter)
+
+
+def _write_startup_times(terminalreporter):
+    if not _timelines:
+        return
+    terminalreporter.write_sep("=", "localstack startup times")
+    for fixture_name, timelines in _timelines.items():
+        totals = [t.total for t in timelines if t.total is not None]
+        if not totals:
+            continue
+        terminalreporter.write_line(
+            "%s: %i started, %.2fs mean, %.2fs max"
+            % (fixture_name, len(totals), sum(totals) / len(totals), max(totals))
+        )
+        phases = collections.OrderedDict()
+        services = {}
+        for timeline in timelines:
+            for phase, duration in timeline.phases:
+                phases.setdefault(phase, []).append(duration)
+            for service_name, elapsed in timeline.services.items():
+                services[service_name] = max(elapsed, services.get(service_name, 0))
+        terminalreporter.write_line(
+            "    mean phase times: "
+            + ", ".join(
+                "%s %.2fs" % (phase, sum(durations) / len(durations))
+                for phase, durations in phases.items()
+            )
+        )
+        if services:
+            slowest = sorted(services.items(), key=lambda i: i[1], reverse=True)
+            terminalreporter.write_line(
+                "    slowest services: "
+                + ", ".join("%s %.2fs" % item for item in slowest[:5])
+            )
 
 
 def pytest_addoption(parser):
@@ -35,6 +237,74 @@ def pytest_addoption(parser):
         default=5,
         help="max seconds for stopping a localstack container",
     )
+    group.addoption(
+        "--localstack-pull-policy",
+        action="store",
+        default=None,
+        help="when to pull the localstack image: always, if-missing, never "
+        "or if-older-than=<duration> (e.g. if-older-than=12h); "
+        "overrides the pull_image fixture argument",
+    )
+    group.addoption(
+        "--localstack-async-teardown",
+        action="store_true",
+        default=False,
+        help="stop localstack containers in the background instead of "
+        "waiting for them when fixtures are torn down",
+    )
+    group.addoption(
+        "--localstack-no-reap",
+        action="store_false",
+        dest="localstack_reap",
+        default=True,
+        help="don't remove localstack containers left behind by killed "
+        "test runs when starting a container",
+    )
+    group.addoption(
+        "--localstack-reuse",
+        action="store_true",
+        default=False,
+        help="keep localstack containers running after the test run and "
+        "reuse them in later runs with the same configuration, resetting "
+        "their state before each use, even for fixtures with reset=False "
+        "(can't be combined with --localstack-pool, --localstack-prestart "
+        "or --localstack-share)",
+    )
+    group.addoption(
+        "--localstack-reuse-idle-ttl",
+        action="store",
+        type=int,
+        default=constants.DEFAULT_REUSE_IDLE_TTL,
+        help="seconds a container kept with --localstack-reuse may go "
+        "unused before it is removed (must be positive)",
+    )
+    group.addoption(
+        "--localstack-pool",
+        action="store_true",
+        default=False,
+        help="reuse running localstack containers between fixtures with "
+        "identical configuration instead of starting a new one for each "
+        "(containers are not reset between uses, except for fixtures with "
+        "reset=True; --localstack-share takes precedence for other fixtures)",
+    )
+    group.addoption(
+        "--localstack-prestart",
+        action="store_true",
+        default=False,
+        help="start the localstack containers of fixtures declared in "
+        "conftest.py files in the background while tests are collected "
+        "(no effect with --localstack-share)",
+    )
+    group.addoption(
+        "--localstack-share",
+        action="store_true",
+        default=False,
+        help="run one localstack container per configuration for the whole "
+        "test run, shared by all pytest-xdist workers and by identically "
+        "configured fixtures, which see each other's state (no effect "
+        "without pytest-xdist; fixtures with reset=True don't share "
+        "containers between workers)",
+    )
 
 
 def session_fixture(
@@ -50,6 +320,7 @@ def session_fixture(
     auto_remove=True,
     pull_image=True,
     container_name=None,
+    reset=False,
     **kwargs
 ):
     """Create a pytest fixture that provides a LocalstackSession.
@@ -97,10 +368,18 @@ def session_fixture(
             image to use. Defaults to :const:`"latest"`.
         auto_remove (bool, optional): If :obj:`True`, delete the Localstack
             container when it stops. Default: :obj:`True`
-        pull_image (bool, optional): If :obj:`True`, pull the Localstack
-            image before running it. Default: :obj:`True`.
+        pull_image (bool, str, optional): When to pull the Localstack
+            image, see :class:`.LocalstackSession` for the pull policies.
+            Overridden by the ``--localstack-pull-policy`` option.
+            Default: :obj:`True`
         container_name (str, optional): The name for the Localstack
             container. Defaults to a randomly generated id.
+        reset (bool, optional): If :obj:`True`, start one Localstack
+            container for the whole test run and wipe its state each
+            time the fixture is set up instead of starting a new
+            container, see :meth:`.RunningSession.reset`. Fixtures
+            with ``reset`` don't use ``--localstack-share``.
+            Default: :obj:`False`
         **kwargs: Additional kwargs will be passed to the
             :class:`.LocalstackSession`.
 
@@ -109,30 +388,58 @@ def session_fixture(
 
     """
 
+    session_kwargs = dict(
+        docker_client=docker_client,
+        services=services,
+        region_name=region_name,
+        kinesis_error_probability=kinesis_error_probability,
+        dynamodb_error_probability=dynamodb_error_probability,
+        container_log_level=container_log_level,
+        localstack_version=localstack_version,
+        auto_remove=auto_remove,
+        pull_image=pull_image,
+        container_name=container_name,
+        **kwargs
+    )
+    _declare_session(**session_kwargs)
+
     @pytest.fixture(scope=scope, autouse=autouse)
     def _fixture(pytestconfig):
         if not pytestconfig.pluginmanager.hasplugin("localstack"):
             pytest.skip("skipping because localstack plugin isn't loaded")
-        with _make_session(
-            docker_client=docker_client,
-            services=services,
-            region_name=region_name,
-            kinesis_error_probability=kinesis_error_probability,
-            dynamodb_error_probability=dynamodb_error_probability,
-            container_log_level=container_log_level,
-            localstack_version=localstack_version,
-            auto_remove=auto_remove,
-            pull_image=pull_image,
-            container_name=container_name,
-            **kwargs
-        ) as session:
+        with _make_session(reset=reset, **session_kwargs) as session:
             yield session
 
     return _fixture
 
 
-@contextlib.contextmanager
-def _make_session(docker_client, *args, **kwargs):
+def _declare_session(docker_client, *args, **kwargs):
+    """Remember the parameters of a fixture's session so it can be prestarted."""
+    _declared_sessions.setdefault(
+        pool.config_key(*args, **kwargs), (docker_client, args, kwargs)
+    )
+
+
+def _prestart_sessions():
+    """Start the sessions of all declared fixtures in background threads."""
+    if not _declared_sessions:
+        return
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(_declared_sessions)
+    )
+    for key, (docker_client, args, kwargs) in _declared_sessions.items():
+        logger.debug("Prestarting Localstack session %s", key)
+        _prestarted[key] = executor.submit(
+            _start_session, docker_client, *args, **kwargs
+        )
+    executor.shutdown(wait=False)
+
+
+def _start_session(docker_client, *args, **kwargs):
+    import docker
+
+    from pytest_localstack import session
+
     utils.check_proxy_env_vars()
 
     if docker_client is None:
@@ -143,23 +450,154 @@ def _make_session(docker_client, *args, **kwargs):
     except docker.errors.APIError:
         pytest.fail("Could not connect to Docker.")
 
-    _session = session.LocalstackSession(docker_client, *args, **kwargs)
+    _remove_orphans_once(docker_client)
 
+    if _pull_policy is not None:
+        kwargs["pull_image"] = _pull_policy
+    kwargs.setdefault("owner_pid", _owner_pid)
+
+    _session = session.LocalstackSession(
+        docker_client, *args, image_pull_times=_image_pull_times, **kwargs
+    )
     _session.start(timeout=_start_timeout)
+    return _session
+
+
+def _remove_orphans_once(docker_client):
+    """Remove orphaned containers in the background, once per process."""
+    global _orphans_removed
+    with _orphans_lock:
+        if _orphans_removed or not _remove_orphans:
+            return
+        _orphans_removed = True
+
+    def _remove():
+        from pytest_localstack import orphans
+
+        try:
+            orphans.remove_orphans(docker_client)
+        except Exception:
+            logger.warning("Failed to remove orphaned containers", exc_info=True)
+
+    threading.Thread(target=_remove, name="localstack-orphans", daemon=True).start()
+
+
+@contextlib.contextmanager
+def _make_session(docker_client, *args, reset=False, **kwargs):
+    """Provide a started session for a fixture, honoring the plugin options.
+
+    Sessions are looked up by their configuration (see
+    :func:`pool.config_key`), not by fixture. With ``--localstack-share``
+    or ``--localstack-pool``, identically configured fixtures therefore
+    use the same container and see each other's state, even when they
+    are used at the same time. Only ``--localstack-reuse`` and fixtures
+    with `reset` set give concurrent users containers of their own.
+    """
+    key = pool.config_key(*args, **kwargs)
+
+    def _start_or_join_session():
+        prestarted = _prestarted.pop(key, None)
+        if prestarted is not None:
+            return prestarted.result()
+        return _start_session(docker_client, *args, **kwargs)
+
+    def _attach_session(hostname, edge_port):
+        from pytest_localstack import session
+
+        _session = session.RunningSession(
+            hostname, *args, edge_port=edge_port, **kwargs
+        )
+        _session.start(timeout=_start_timeout)
+        return _session
+
+    if _reused is not None:
+        import docker
+
+        from pytest_localstack import session
+
+        if docker_client is None:
+            docker_client = docker.from_env()
+
+        def _start_reusable_session(labels):
+            # The container outlives this process, so only idle time counts.
+            return _start_session(
+                docker_client,
+                *args,
+                **dict(kwargs, container_labels=labels, container_ttl=None)
+            )
+
+        def _attach_container(container):
+            ports = session._published_ports(container.attrs)
+            return _attach_session(constants.LOCALHOST, ports[constants.EDGE_PORT])
+
+        # Each pytest-xdist worker gets its own container, since
+        # they are reset independently.
+        reuse_key = key if _worker_id is None else "%s-%s" % (key, _worker_id)
+        _session = _reused.acquire(
+            reuse_key, docker_client, _start_reusable_session, _attach_container
+        )
+        try:
+            _session.reset()
+            yield _session
+        finally:
+            _reused.release(_session)
+        return
+
+    if reset:
+        # Sessions that are reset can be reused by any fixture
+        # with the same configuration.
+        reset_pool = _pool if _pool is not None else _reset_pool
+        _session = reset_pool.acquire(key, _start_or_join_session)
+        try:
+            _session.reset()
+            yield _session
+        finally:
+            reset_pool.release(_session)
+        return
+
+    if _shared is not None:
+        import docker
+
+        if docker_client is None:
+            docker_client = docker.from_env()
+
+        def _attach_shared(state):
+            return _attach_session(state["hostname"], state["edge_port"])
+
+        yield _shared.get(key, docker_client, _start_or_join_session, _attach_shared)
+        return
+
+    if _pool is None:
+        _session = _start_or_join_session()
+        try:
+            yield _session
+        finally:
+            _session.stop(timeout=_stop_timeout, reaper=_reaper)
+        return
+
+    _session = _pool.acquire(key, _start_or_join_session)
     try:
         yield _session
     finally:
-        _session.stop(timeout=_stop_timeout)
+        _pool.release(_session)
 
 
-# Register contrib modules
-plugin.register_plugin_module("pytest_localstack.contrib.botocore")
-plugin.register_plugin_module("pytest_localstack.contrib.boto3", False)
+def __getattr__(name):
+    """Load the default plugins the first time a contributed name is used.
+
+    Plugins add their fixture factories to this module, for example
+    :func:`pytest_localstack.patch_fixture`, with the
+    ``contribute_to_module`` hook.
+    """
+    if name.startswith(("_", "pytest_")) or plugin._default_plugins_loaded:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    plugin.load_default_plugins()
+    if not plugin._default_plugins_loaded:
+        # The plugins are being loaded by this thread.
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return getattr(sys.modules[__name__], name)
 
-# Register 3rd-party modules
-plugin.manager.load_setuptools_entrypoints("localstack")
 
-# Trigger pytest_localstack_contribute_to_module hook
-plugin.manager.hook.contribute_to_module.call_historic(
-    kwargs={"pytest_localstack": sys.modules[__name__]}
-)
+if sys.version_info < (3, 7):
+    # Module __getattr__ needs Python 3.7 (PEP 562).
+    plugin.load_default_plugins()
@@ -0,0 +1,6 @@
+"""Run the ``pytest-localstack`` command with ``python -m pytest_localstack``."""
+import sys
+
+from pytest_localstack.orphans import main
+
+sys.exit(main())
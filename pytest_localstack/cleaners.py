@@ -0,0 +1,208 @@
+"""Wipe the state of a running Localstack.
+
+Restarting the container is the simplest way to get a clean Localstack,
+but it takes many seconds. :func:`reset` instead asks Localstack to
+reset its state in place, which newer Localstack versions support.
+For versions that don't, it falls back to deleting the resources of
+each service with a botocore client.
+
+Each cleaner takes a botocore client for its service and deletes every
+resource it finds. Services without a cleaner are left as they are.
+"""
+import concurrent.futures
+import http.client
+import logging
+
+from pytest_localstack import exceptions, service_checks, services
+
+logger = logging.getLogger(__name__)
+
+# Localstack's internal endpoint to reset the state of all services.
+RESET_PATH = "/_localstack/state/reset"
+
+
+def reset_endpoint(localstack_session, timeout=10):
+    """Reset Localstack with its internal reset endpoint.
+
+    Args:
+        localstack_session (:class:`.RunningSession`): The session to reset.
+        timeout (float, optional): Connection and read timeout in seconds.
+            Default: 10
+
+    Returns:
+        bool: False if this Localstack version has no reset endpoint,
+        which is assumed for any 4xx response other than 401 and 403.
+
+    Raises:
+        pytest_localstack.exceptions.ServiceError: If the reset failed.
+
+    """
+    connection = service_checks.edge_connection(localstack_session, timeout)
+    try:
+        connection.request("POST", RESET_PATH)
+        response = connection.getresponse()
+        response.read()
+    except (OSError, http.client.HTTPException) as e:
+        raise exceptions.ServiceError("Localstack reset failed") from e
+    finally:
+        connection.close()
+    if 400 <= response.status < 500 and response.status not in (401, 403):
+        logger.debug(
+            "Localstack reset endpoint returned HTTP %i, assuming there is none",
+            response.status,
+        )
+        return False
+    if response.status >= 300:
+        raise exceptions.ServiceError(
+            "Localstack reset returned HTTP %i" % response.status
+        )
+    return True
+
+
+def sweep(localstack_session, max_workers=16):
+    """Delete the resources of every session service that has a cleaner.
+
+    Services are cleaned concurrently.
+
+    Args:
+        localstack_session (:class:`.RunningSession`): The session to clean.
+        max_workers (int, optional): The maximum number of services
+            to clean at once. Default: 16
+
+    Raises:
+        pytest_localstack.exceptions.ServiceError: If any service
+            couldn't be cleaned.
+
+    """
+    service_names = [name for name in localstack_session.services if name in CLEANERS]
+    if not service_names:
+        return
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(service_names)),
+        thread_name_prefix="localstack-sweep",
+    ) as executor:
+        futures = {
+            executor.submit(_clean, localstack_session, service_name): service_name
+            for service_name in service_names
+        }
+        failed = []
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                logger.debug("Failed to clean %s", futures[future], exc_info=True)
+                failed.append(futures[future])
+    if failed:
+        raise exceptions.ServiceError(
+            "Failed to clean Localstack services: " + ", ".join(sorted(failed))
+        )
+
+
+def reset(localstack_session, timeout=10, max_workers=16):
+    """Wipe the state of every service in a Localstack session.
+
+    Uses :func:`reset_endpoint` if Localstack supports it,
+    otherwise :func:`sweep`.
+
+    Returns:
+        str: ``"endpoint"`` or ``"sweep"``, whichever was used.
+
+    """
+    if reset_endpoint(localstack_session, timeout=timeout):
+        return "endpoint"
+    sweep(localstack_session, max_workers=max_workers)
+    return "sweep"
+
+
+def _clean(localstack_session, service_name):
+    botocore_name = services.SERVICES[service_name].botocore_name
+    CLEANERS[service_name](localstack_session.botocore.client(botocore_name))
+
+
+def _paginate(client, operation_name, result_key, **kwargs):
+    for page in client.get_paginator(operation_name).paginate(**kwargs):
+        for item in page.get(result_key, []):
+            yield item
+
+
+def clean_s3(client):
+    """Delete every S3 bucket and the objects in it."""
+    for bucket in client.list_buckets()["Buckets"]:
+        name = bucket["Name"]
+        for page in client.get_paginator("list_object_versions").paginate(Bucket=name):
+            objects = [
+                {"Key": o["Key"], "VersionId": o["VersionId"]}
+                for o in page.get("Versions", []) + page.get("DeleteMarkers", [])
+            ]
+            if objects:
+                client.delete_objects(Bucket=name, Delete={"Objects": objects})
+        client.delete_bucket(Bucket=name)
+
+
+def clean_dynamodb(client):
+    """Delete every DynamoDB table."""
+    for table_name in _paginate(client, "list_tables", "TableNames"):
+        client.delete_table(TableName=table_name)
+
+
+def clean_sqs(client):
+    """Delete every SQS queue."""
+    for queue_url in client.list_queues().get("QueueUrls", []):
+        client.delete_queue(QueueUrl=queue_url)
+
+
+def clean_sns(client):
+    """Delete every SNS topic."""
+    for topic in _paginate(client, "list_topics", "Topics"):
+        client.delete_topic(TopicArn=topic["TopicArn"])
+
+
+def clean_kinesis(client):
+    """Delete every Kinesis stream."""
+    for stream_name in _paginate(client, "list_streams", "StreamNames"):
+        client.delete_stream(StreamName=stream_name)
+
+
+def clean_lambda(client):
+    """Delete every Lambda function."""
+    for function in _paginate(client, "list_functions", "Functions"):
+        client.delete_function(FunctionName=function["FunctionName"])
+
+
+def clean_logs(client):
+    """Delete every CloudWatch Logs log group."""
+    for log_group in _paginate(client, "describe_log_groups", "logGroups"):
+        client.delete_log_group(logGroupName=log_group["logGroupName"])
+
+
+def clean_secretsmanager(client):
+    """Delete every Secrets Manager secret without a recovery window."""
+    for secret in _paginate(client, "list_secrets", "SecretList"):
+        client.delete_secret(SecretId=secret["ARN"], ForceDeleteWithoutRecovery=True)
+
+
+def clean_ssm(client):
+    """Delete every SSM parameter."""
+    for parameter in _paginate(client, "describe_parameters", "Parameters"):
+        client.delete_parameter(Name=parameter["Name"])
+
+
+def clean_stepfunctions(client):
+    """Delete every Step Functions state machine."""
+    for state_machine in _paginate(client, "list_state_machines", "stateMachines"):
+        client.delete_state_machine(stateMachineArn=state_machine["stateMachineArn"])
+
+
+# Localstack service name -> cleaner
+CLEANERS = {
+    "dynamodb": clean_dynamodb,
+    "kinesis": clean_kinesis,
+    "lambda": clean_lambda,
+    "logs": clean_logs,
+    "s3": clean_s3,
+    "secretsmanager": clean_secretsmanager,
+    "sns": clean_sns,
+    "sqs": clean_sqs,
+    "ssm": clean_ssm,
+    "stepfunctions": clean_stepfunctions,
+}
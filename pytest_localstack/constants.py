@@ -1,12 +1,15 @@
 """pytest-localstack constants."""
 
-import botocore
+import sys
 
 from pytest_localstack import utils
 
 # IP for localhost
 LOCALHOST = "127.0.0.1"
 
+# Localstack's single "edge" port that serves every AWS service.
+EDGE_PORT = 4566
+
 # The default AWS region.
 DEFAULT_AWS_REGION = "us-east-1"
 
@@ -22,4 +25,34 @@ DEFAULT_AWS_SESSION_TOKEN = "token"
 DEFAULT_CONTAINER_START_TIMEOUT = 60
 DEFAULT_CONTAINER_STOP_TIMEOUT = 10
 
-BOTOCORE_VERSION = utils.get_version_tuple(botocore.__version__)
+# Seconds after which a container may be removed as an orphan.
+DEFAULT_CONTAINER_TTL = 6 * 60 * 60
+
+# Seconds a container kept with --localstack-reuse may go unused.
+DEFAULT_REUSE_IDLE_TTL = 30 * 60
+
+# Labels on the containers started by pytest-localstack.
+LABEL_PID = "pytest-localstack.pid"
+LABEL_HOST = "pytest-localstack.host"
+LABEL_PID_NAMESPACE = "pytest-localstack.pid-namespace"
+LABEL_STARTED = "pytest-localstack.started"
+LABEL_TTL = "pytest-localstack.ttl"
+# Labels on containers kept with --localstack-reuse.
+LABEL_CONFIG = "pytest-localstack.config"
+LABEL_IDLE_TTL = "pytest-localstack.idle-ttl"
+
+
+def __getattr__(name):
+    # BOTOCORE_VERSION imports botocore, so only do that when it's used.
+    global BOTOCORE_VERSION
+    if name == "BOTOCORE_VERSION":
+        import botocore
+
+        BOTOCORE_VERSION = utils.get_version_tuple(botocore.__version__)
+        return BOTOCORE_VERSION
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ needs Python 3.7 (PEP 562).
+    __getattr__("BOTOCORE_VERSION")
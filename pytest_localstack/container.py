@@ -1,8 +1,205 @@
 """Docker container tools."""
+import collections
+import concurrent.futures
+import gzip
+import logging
+import os
+import re
 import threading
 
 from pytest_localstack import utils
 
+logger = logging.getLogger(__name__)
+
+
+class ContainerReaper:
+    """Stop Docker containers in background threads.
+
+    Handing containers to a reaper lets tests go on while the containers
+    shut down. Call :meth:`drain` to wait for them.
+
+    Args:
+        max_workers (int, optional): The maximum number of containers
+            to stop at once. Default: 8
+
+    """
+
+    def __init__(self, max_workers=8):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="localstack-reaper"
+        )
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def stop(self, container, timeout=10):
+        """Stop a container in the background.
+
+        Args:
+            container (:class:`docker.models.containers.Container`):
+                The container to stop.
+            timeout (float, optional): Timeout in seconds to wait for the
+                container to stop before sending a SIGKILL. Default: 10
+
+        """
+        logger.debug("Reaping container %s", container.short_id)
+        future = self._executor.submit(self._stop, container, timeout)
+        with self._lock:
+            self._futures.append(future)
+
+    @staticmethod
+    def _stop(container, timeout):
+        try:
+            container.stop(timeout=timeout)
+        except Exception:
+            logger.warning(
+                "Failed to stop container %s", container.short_id, exc_info=True
+            )
+
+    def drain(self, timeout=None):
+        """Wait for every container handed to the reaper to stop.
+
+        Args:
+            timeout (float, optional): Wait at most this many seconds.
+
+        Returns:
+            int: The number of containers still stopping.
+
+        """
+        with self._lock:
+            futures, self._futures = self._futures, []
+        _, not_done = concurrent.futures.wait(futures, timeout=timeout)
+        with self._lock:
+            self._futures.extend(not_done)
+        return len(not_done)
+
+    def close(self, timeout=None):
+        """Wait for the containers to stop and shut down the threads."""
+        self.drain(timeout=timeout)
+        self._executor.shutdown(wait=False)
+
+
+class LogRingBuffer:
+    """Keep the last lines of a log in memory.
+
+    The oldest lines are dropped once the buffer holds more than
+    `max_lines` lines or `max_bytes` bytes.
+
+    Args:
+        max_lines (int, optional): The maximum number of lines to keep.
+            Must be at least 1.
+        max_bytes (int, optional): The maximum total size of the lines
+            to keep. Decoded lines are measured in UTF-8 bytes.
+            The newest line is always kept.
+
+    Raises:
+        ValueError: If `max_lines` is less than 1.
+
+    """
+
+    def __init__(self, max_lines=None, max_bytes=None):
+        if max_lines is not None and max_lines < 1:
+            raise ValueError("max_lines must be at least 1, not %r" % (max_lines,))
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped = 0
+        self._lines = collections.deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+
+    def append(self, line):
+        """Add a line, dropping the oldest lines if needed."""
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.size -= _byte_length(self._lines[0])
+                self.dropped += 1
+            self._lines.append(line)
+            self.size += _byte_length(line)
+            if self.max_bytes is not None:
+                while self.size > self.max_bytes and len(self._lines) > 1:
+                    self.size -= _byte_length(self._lines.popleft())
+                    self.dropped += 1
+
+    def lines(self):
+        """Return a list of the kept lines, oldest first."""
+        with self._lock:
+            return list(self._lines)
+
+    def __len__(self):
+        return len(self._lines)
+
+
+def _byte_length(line):
+    if isinstance(line, str):
+        return len(line.encode("utf-8", "replace"))
+    return len(line)
+
+
+class LogFileSink:
+    """Write raw log bytes to a file, rotating it when it gets too big.
+
+    Rotated files are renamed like :class:`logging.handlers.RotatingFileHandler`
+    does, with ``.1`` the most recent (``.1.gz`` if compressed). A file
+    left at `path` by an earlier session is rotated, not overwritten.
+
+    Args:
+        path (str): The log file path. ``.gz`` is appended if `compress`.
+        max_bytes (int, optional): Rotate the file before it grows past
+            this many (uncompressed) bytes. Default is to never rotate.
+        backup_count (int, optional): The number of rotated files to keep.
+            Default: 5
+        compress (bool, optional): Gzip the log files. Default: False
+
+    """
+
+    def __init__(self, path, max_bytes=None, backup_count=5, compress=False):
+        self.base_path = path
+        self.suffix = ".gz" if compress else ""
+        self.path = path + self.suffix
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.size = 0
+        if os.path.exists(self.path):
+            self._shift_files()
+        self._file = self._open()
+
+    def _open(self):
+        if self.compress:
+            return gzip.open(self.path, "wb")
+        return open(self.path, "wb")
+
+    def _rotated_path(self, i):
+        return "%s.%i%s" % (self.base_path, i, self.suffix)
+
+    def write(self, data):
+        """Write a chunk of bytes, rotating the file first if needed."""
+        if (
+            self.max_bytes is not None
+            and self.size
+            and self.size + len(data) > self.max_bytes
+        ):
+            self.rotate()
+        self._file.write(data)
+        self.size += len(data)
+
+    def rotate(self):
+        """Close the current file and start a new one."""
+        self._file.close()
+        self._shift_files()
+        self._file = self._open()
+        self.size = 0
+
+    def _shift_files(self):
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(self._rotated_path(i)):
+                    os.replace(self._rotated_path(i), self._rotated_path(i + 1))
+            os.replace(self.path, self._rotated_path(1))
+
+    def close(self):
+        """Flush and close the current file."""
+        self._file.close()
+
 
 class DockerLogTailer(threading.Thread):
     """Write Docker container logs to a Python standard logger.
@@ -12,6 +209,7 @@ class DockerLogTailer(threading.Thread):
             A container object returned by docker-py's
             `run(detach=True)` method.
         logger (:class:`logging.Logger`): A standard Python logger.
+            Set to None to not log the lines.
         log_level (int): The log level to use.
         stdout (bool, optional): Capture the containers stdout logs.
             Default is True.
@@ -19,11 +217,20 @@ class DockerLogTailer(threading.Thread):
             Default is True.
         encoding (str, optional): Read container logs bytes using
             this encoding. Default is utf-8. Set to None to log raw bytes.
+        buffer (:class:`LogRingBuffer`, optional): Also append the lines
+            to this buffer.
 
     """
 
     def __init__(
-        self, container, logger, log_level, stdout=True, stderr=True, encoding="utf-8"
+        self,
+        container,
+        logger,
+        log_level,
+        stdout=True,
+        stderr=True,
+        encoding="utf-8",
+        buffer=None,
     ):
         self.container = container
         self.logger = logger
@@ -31,9 +238,52 @@ class DockerLogTailer(threading.Thread):
         self.stdout = stdout
         self.stderr = stderr
         self.encoding = encoding
+        self.buffer = buffer
+        self._watches = []
+        self._watches_lock = threading.Lock()
         super(DockerLogTailer, self).__init__()
         self.daemon = True
 
+    def watch(self, pattern):
+        """Get an event that is set once a log line matches `pattern`.
+
+        Watch before calling :meth:`start` to make sure no lines are missed.
+
+        Args:
+            pattern (str): A regular expression to search each line for.
+
+        Returns:
+            :class:`threading.Event`
+
+        """
+        event = threading.Event()
+        with self._watches_lock:
+            self._watches.append((re.compile(pattern), event))
+        return event
+
+    def unwatch(self, event):
+        """Stop watching for a pattern watched with :meth:`watch`."""
+        with self._watches_lock:
+            self._watches = [w for w in self._watches if w[1] is not event]
+
+    def _check_watches(self, line):
+        with self._watches_lock:
+            for pattern, event in self._watches:
+                if pattern.search(line):
+                    event.set()
+            self._watches = [w for w in self._watches if not w[1].is_set()]
+
+    def _handle_line(self, line, logger):
+        if self.encoding is not None and isinstance(line, bytes):
+            line = line.decode(self.encoding)
+        line = utils.remove_newline(line)
+        if self._watches:
+            self._check_watches(line)
+        if self.buffer is not None:
+            self.buffer.append(line)
+        if logger is not None:
+            logger.log(self.log_level, line)
+
     def run(self):
         """Tail the container logs as a separate thread."""
         try:
@@ -41,10 +291,110 @@ class DockerLogTailer(threading.Thread):
                 stream=True, stdout=self.stdout, stderr=self.stderr
             )
             for line in logs_generator:
-                if self.encoding is not None and isinstance(line, bytes):
-                    line = line.decode(self.encoding)
-                line = utils.remove_newline(line)
-                self.logger.log(self.log_level, line)
+                self._handle_line(line, self.logger)
+        except Exception as e:
+            self.exception = e
+            raise
+
+
+class DockerLogReader(DockerLogTailer):
+    """Tail both the stdout and stderr logs of a Docker container.
+
+    Unlike two :class:`DockerLogTailer` threads, this reads both streams
+    with one thread and one connection to the Docker daemon, using its
+    multiplexed attach stream.
+
+    Args:
+        container (:class:`docker.models.containers.Container`):
+            A container object returned by docker-py's
+            `run(detach=True)` method.
+        logger (:class:`logging.Logger`): A standard Python logger.
+            Lines are logged to its ``stdout`` and ``stderr`` children.
+            Set to None to not log the lines.
+        log_level (int): The log level to use.
+        encoding (str, optional): Read container logs bytes using
+            this encoding. Default is utf-8. Set to None to log raw bytes.
+        buffer (:class:`LogRingBuffer`, optional): Also append the lines
+            to this buffer.
+        sink (:class:`LogFileSink`, optional): Copy the raw log bytes of
+            both streams to this file. Unless there's also a `logger`,
+            `buffer` or pending :meth:`watch`, the logs aren't split
+            into lines at all. The sink is closed when the thread ends.
+
+    """
+
+    STREAMS = ("stdout", "stderr")
+
+    def __init__(
+        self, container, logger, log_level, encoding="utf-8", buffer=None, sink=None
+    ):
+        super(DockerLogReader, self).__init__(
+            container, logger, log_level, encoding=encoding, buffer=buffer
+        )
+        self.sink = sink
+        self._loggers = {
+            name: None if logger is None else logger.getChild(name)
+            for name in self.STREAMS
+        }
+        self._stream = None
+        self._stream_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def run(self):
+        """Tail the container logs as a separate thread."""
+        try:
+            stream = self.container.attach(
+                stdout=True, stderr=True, stream=True, logs=True, demux=True
+            )
+            with self._stream_lock:
+                self._stream = stream
+            if self._stopping.is_set():
+                stream.close()
+                return
+            # Frames aren't split on line boundaries.
+            partial_lines = {name: b"" for name in self.STREAMS}
+            for frames in stream:
+                if self.sink is not None:
+                    for data in frames:
+                        if data:
+                            self.sink.write(data)
+                    if (
+                        self.logger is None
+                        and self.buffer is None
+                        and not self._watches
+                    ):
+                        continue
+                for name, data in zip(self.STREAMS, frames):
+                    if not data:
+                        continue
+                    lines = (partial_lines[name] + data).split(b"\n")
+                    partial_lines[name] = lines.pop()
+                    for line in lines:
+                        self._handle_line(line, self._loggers[name])
+            for name, line in partial_lines.items():
+                if line:
+                    self._handle_line(line, self._loggers[name])
         except Exception as e:
+            if self._stopping.is_set():
+                # Closing the stream interrupts reading it.
+                return
             self.exception = e
             raise
+        finally:
+            if self.sink is not None:
+                self.sink.close()
+
+    def stop(self, timeout=None):
+        """Stop tailing the logs and wait for the thread to finish.
+
+        Args:
+            timeout (float, optional): Wait at most this many seconds.
+
+        """
+        self._stopping.set()
+        with self._stream_lock:
+            stream = self._stream
+        if stream is not None:
+            stream.close()
+        if self.is_alive():
+            self.join(timeout)
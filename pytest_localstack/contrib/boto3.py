@@ -1,12 +1,23 @@
 """pytest-localstack extensions for boto3."""
+import functools
+import inspect
 import logging
 
 import boto3.session
 
 from pytest_localstack import constants, hookspecs
+from pytest_localstack.contrib import botocore as localstack_botocore
 
 logger = logging.getLogger(__name__)
 
+# The signatures of boto3.session.Session's factory methods, without `self`.
+_SIGNATURES = {
+    kind: inspect.signature(
+        functools.partial(getattr(boto3.session.Session, kind), None)
+    )
+    for kind in ("client", "resource")
+}
+
 
 @hookspecs.pytest_localstack_hookimpl
 def contribute_to_session(session):
@@ -15,9 +26,19 @@ def contribute_to_session(session):
     session.boto3 = Boto3TestResourceFactory(session)
 
 
+@hookspecs.pytest_localstack_hookimpl
+def session_stopped(session):
+    """Forget cached clients and resources, which point at the stopped container."""
+    session.boto3.clear_cache()
+
+
 class Boto3TestResourceFactory:
     """Create boto3 clients and resources to interact with a :class:`~.LocalstackSession`.
 
+    Clients and resources are cached like botocore clients if the
+    session has a ``client_cache_size``, see
+    :class:`~pytest_localstack.contrib.botocore.BotocoreTestResourceFactory`.
+
     Args:
         localstack_session (:class:`.LocalstackSession`):
             The session that this factory should create test resources for.
@@ -28,6 +49,7 @@ class Boto3TestResourceFactory:
         logger.debug("Boto3TestResourceFactory.__init__")
         self.localstack_session = localstack_session
         self._default_session = None
+        self._client_cache = localstack_botocore.client_cache(localstack_session)
 
     def session(self, *args, **kwargs):
         """Return a boto3 Session object that will use localstack.
@@ -52,19 +74,34 @@ class Boto3TestResourceFactory:
             self._default_session = self.session()
         return self._default_session
 
-    def client(self, service_name):
+    def client(self, service_name, *args, **kwargs):
         """Return a patched boto3 Client object that will use localstack.
 
         Arguments are the same as :func:`boto3.client`.
         """
-        return self.default_session.client(service_name)
+        return self._cached(
+            "client", self.default_session.client, service_name, *args, **kwargs
+        )
 
-    def resource(self, service_name):
+    def resource(self, service_name, *args, **kwargs):
         """Return a patched boto3 Resource object that will use localstack.
 
         Arguments are the same as :func:`boto3.resource`.
         """
-        return self.default_session.resource(service_name)
+        return self._cached(
+            "resource", self.default_session.resource, service_name, *args, **kwargs
+        )
+
+    def clear_cache(self):
+        """Forget all cached clients and resources."""
+        if self._client_cache is not None:
+            self._client_cache.clear()
+
+    def _cached(self, kind, create, *args, **kwargs):
+        if self._client_cache is None:
+            return create(*args, **kwargs)
+        key = localstack_botocore.client_cache_key(_SIGNATURES[kind], *args, **kwargs)
+        return self._client_cache.get((kind, key), lambda: create(*args, **kwargs))
 
     # No need for a patch method.
     # Running the botocore patch will also patch boto3.
@@ -1,21 +1,40 @@
 """Test resource factory for the botocore library."""
+import collections
 import contextlib
+import copy
 import functools
+import gc
 import inspect
+import itertools
 import logging
+import os
 import socket
+import threading
+import time
+import urllib.parse
 import weakref
 
 import botocore
 import botocore.client
 import botocore.config
 import botocore.credentials
+import botocore.exceptions
+import botocore.loaders
 import botocore.regions
 import botocore.session
+from botocore.awsrequest import prepare_request_dict
 
 import pytest
 
-from pytest_localstack import _make_session, constants, exceptions, hookspecs, utils
+from pytest_localstack import (
+    _declare_session,
+    _make_session,
+    constants,
+    exceptions,
+    hookspecs,
+    utils,
+)
+from pytest_localstack.services import SERVICES
 from pytest_localstack.utils import mock
 
 try:
@@ -25,6 +44,21 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# How patch_botocore() redirects clients that existed before patching.
+PATCH_MODES = ("proxy", "events")
+
+# Options for the check that patched clients only talk to Localstack.
+HOST_CHECKS = ("strict", "sampled", "off")
+
+# The "sampled" host check checks one in this many requests.
+HOST_CHECK_SAMPLE_RATE = 100
+
+# Client attribute for clients redirected by events. It holds the
+# event handler ids of the patches redirecting the client, innermost last.
+_REDIRECTED = "_pytest_localstack_redirected"
+_redirect_ids = itertools.count()
+_redirect_lock = threading.Lock()
+
 
 @hookspecs.pytest_localstack_hookimpl
 def contribute_to_session(session):
@@ -33,6 +67,33 @@ def contribute_to_session(session):
     session.botocore = BotocoreTestResourceFactory(session)
 
 
+@hookspecs.pytest_localstack_hookimpl
+def session_warm_up(session):
+    """Load service models and create clients before tests need them."""
+    session.botocore.warm_up()
+
+
+@hookspecs.pytest_localstack_hookimpl
+def session_stopped(session):
+    """Forget cached clients, which point at the stopped container."""
+    session.botocore.clear_cache()
+
+
+@hookspecs.pytest_localstack_hookimpl
+def terminal_summary(terminalreporter):
+    """Report the botocore data files loaded by :class:`SharedLoader` (with -v)."""
+    files, uses = shared_loader_report()
+    if terminalreporter.config.getoption("verbose") < 1 or not files:
+        return
+    terminalreporter.write_sep("=", "localstack botocore data")
+    terminalreporter.write_line(
+        "%i files, %.1f MiB of JSON loaded once for %i botocore sessions"
+        % (len(files), sum(size for _, size in files) / 2 ** 20, uses)
+    )
+    for path, size in files[:5]:
+        terminalreporter.write_line("    %s: %.1f KiB" % (path, size / 2 ** 10))
+
+
 @hookspecs.pytest_localstack_hookimpl
 def contribute_to_module(pytest_localstack):
     """Add :func:`patch_fixture` to :mod:`pytest_localstack`."""
@@ -43,6 +104,12 @@ def contribute_to_module(pytest_localstack):
 class BotocoreTestResourceFactory:
     """Create botocore clients to interact with a :class:`.LocalstackSession`.
 
+    Clients can be cached by passing ``client_cache_size=<n>`` to the
+    :class:`.LocalstackSession` (or the fixture factories). :meth:`client`
+    then returns the same client for the same arguments, keeping the
+    `n` most recently used clients. The cache is cleared when the
+    session stops.
+
     Args:
         localstack_session (:class:`.LocalstackSession`):
             The session that this factory should create test resources for.
@@ -53,6 +120,7 @@ class BotocoreTestResourceFactory:
         logger.debug("BotocoreTestResourceFactory.__init__")
         self.localstack_session = localstack_session
         self._default_session = None
+        self._client_cache = client_cache(localstack_session)
 
     def session(self, *args, **kwargs):
         """Create a botocore Session that will use Localstack.
@@ -67,7 +135,40 @@ class BotocoreTestResourceFactory:
         Arguments are the same as
         :meth:`botocore.session.Session.create_client`.
         """
-        return self.default_session.create_client(service_name, *args, **kwargs)
+        if self._client_cache is None:
+            return self.default_session.create_client(service_name, *args, **kwargs)
+        return self._client_cache.get(
+            client_cache_key(_CREATE_CLIENT_SIGNATURE, service_name, *args, **kwargs),
+            lambda: self.default_session.create_client(service_name, *args, **kwargs),
+        )
+
+    def warm_up(self):
+        """Create a client for each of the session's services.
+
+        This loads the service models into the shared loader, and the
+        clients are kept if client caching is enabled. Returns early if
+        the session's warm-up is cancelled.
+        """
+        cancelled = self.localstack_session.warm_up_cancelled
+        for service_name in self.localstack_session.services:
+            if cancelled.is_set():
+                logger.debug("Warm-up of %r cancelled", self.localstack_session)
+                return
+            botocore_name = SERVICES[service_name].botocore_name
+            start_time = time.time()
+            try:
+                self.client(botocore_name)
+            except botocore.exceptions.UnknownServiceError:
+                logger.debug("botocore has no %s client to warm up", botocore_name)
+                continue
+            logger.debug(
+                "Warmed up %s client in %.3fs", botocore_name, time.time() - start_time
+            )
+
+    def clear_cache(self):
+        """Forget all cached clients."""
+        if self._client_cache is not None:
+            self._client_cache.clear()
 
     @property
     def default_session(self):
@@ -80,12 +181,60 @@ class BotocoreTestResourceFactory:
         return self._default_session
 
     @contextlib.contextmanager
-    def patch_botocore(self):
+    def patch_botocore(self, mode=None, host_check=None):
         """Context manager that will patch botocore to use Localstack.
 
         Since boto3 relies on botocore to perform API calls, this method
         also effectively patches boto3.
+
+        Clients that already existed before patching are redirected
+        to Localstack in one of two modes:
+
+        - ``"proxy"``: Attribute access on every client is intercepted
+          and forwarded to an equivalent Localstack client. This adds
+          some overhead to everything done with any client.
+        - ``"events"``: Existing clients are found with the garbage
+          collector when patching starts, and a ``before-call`` event
+          handler makes their API calls with an equivalent Localstack
+          client. Clients aren't slowed down otherwise, but finding
+          them costs a scan of all Python objects each time patching
+          starts.
+
+        As a safety check, the host of each request is compared with
+        the Localstack hostname (or this machine's hostname) and an
+        AssertionError is raised if it doesn't match. `host_check` can
+        make that check ``"strict"`` (every request), ``"sampled"``
+        (one in every :data:`HOST_CHECK_SAMPLE_RATE` requests)
+        or ``"off"``.
+
+        Args:
+            mode (str, optional): ``"proxy"`` or ``"events"``. Defaults
+                to the session's ``botocore_patch_mode`` argument,
+                or ``"proxy"``.
+            host_check (str, optional): ``"strict"``, ``"sampled"`` or
+                ``"off"``. Defaults to the session's ``botocore_host_check``
+                argument, or ``"strict"``.
+
+        Raises:
+            ValueError: If `mode` or `host_check` isn't valid.
+
         """
+        if mode is None:
+            mode = getattr(self.localstack_session, "botocore_patch_mode", "proxy")
+        if mode not in PATCH_MODES:
+            raise ValueError(
+                "invalid botocore patch mode %r, must be one of %s"
+                % (mode, ", ".join(PATCH_MODES))
+            )
+        if host_check is None:
+            host_check = getattr(
+                self.localstack_session, "botocore_host_check", "strict"
+            )
+        if host_check not in HOST_CHECKS:
+            raise ValueError(
+                "invalid botocore host check %r, must be one of %s"
+                % (host_check, ", ".join(HOST_CHECKS))
+            )
         # Q: Why is this method so complicated?
         # A: Because the most common usecase is something like this::
         #
@@ -196,6 +345,7 @@ class BotocoreTestResourceFactory:
             patches.append(
                 mock.patch.multiple(
                     botocore.session.Session,
+                    _register_data_loader=utils.unbind(Session._register_data_loader),
                     _register_endpoint_resolver=utils.unbind(
                         Session._register_endpoint_resolver
                     ),
@@ -208,101 +358,37 @@ class BotocoreTestResourceFactory:
 
             # Step 2: Safety checks
             # Make absolutly sure we use Localstack and not AWS.
-            _original_convert_to_request_dict = (
-                botocore.client.BaseClient._convert_to_request_dict
-            )
-
-            @functools.wraps(_original_convert_to_request_dict)
-            def _convert_to_request_dict(self, *args, **kwargs):
-                request_dict = _original_convert_to_request_dict(self, *args, **kwargs)
-                assert any(
-                    (
-                        factory.localstack_session.hostname in request_dict["url"],
-                        socket.gethostname() in request_dict["url"],
-                    )
+            _check_url = _make_url_check(factory.localstack_session, host_check)
+            if _check_url is not None:
+                _original_convert_to_request_dict = (
+                    botocore.client.BaseClient._convert_to_request_dict
                 )
-                return request_dict
 
-            patches.append(
-                mock.patch(
-                    "botocore.client.BaseClient._convert_to_request_dict",
-                    _convert_to_request_dict,
+                @functools.wraps(_original_convert_to_request_dict)
+                def _convert_to_request_dict(self, *args, **kwargs):
+                    request_dict = _original_convert_to_request_dict(
+                        self, *args, **kwargs
+                    )
+                    if not self.__dict__.get(_REDIRECTED):
+                        # Redirected clients are checked after redirection.
+                        _check_url(request_dict["url"])
+                    return request_dict
+
+                patches.append(
+                    mock.patch(
+                        "botocore.client.BaseClient._convert_to_request_dict",
+                        _convert_to_request_dict,
+                    )
                 )
-            )
 
             # Step 3: Patch existing clients
             # Patching botocore Session doesn't help with an existing
             # botocore Clients objects. They will have already been created with
-            # endpoints aimed at AWS. We need to patch botocore.client.BaseClient
-            # to temporarially act like a Localstack.
-            original_init = botocore.client.BaseClient.__init__
-
-            @functools.wraps(original_init)
-            def new_init(self, *args, **kwargs):
-                # Every client created during the patch is a Localstack client.
-                # Set this flag so that the proxy_client_attr() stuff below
-                # won't break during original_init().
-                self._is_pytest_localstack = True
-                original_init(self, *args, **kwargs)
-
-            patches.append(
-                mock.patch.multiple(botocore.client.BaseClient, __init__=new_init)
-            )
-
-            # Create a place to store proxy clients.
-            patches.append(
-                mock.patch(
-                    "botocore.client.BaseClient._proxy_clients",
-                    weakref.WeakKeyDictionary(),
-                    create=True,
-                )
-            )
-
-            def new_getattribute(self, key):
-                if key.startswith("__"):
-                    return object.__getattribute__(self, key)
-                proxied_keys = [
-                    "_cache",
-                    "_client_config",
-                    "_endpoint",
-                    "_exceptions_factory",
-                    "_exceptions",
-                    "exceptions",
-                    "_loader",
-                    "_request_signer",
-                    "_response_parser",
-                    "_serializer",
-                    "meta",
-                ]
-                __dict__ = object.__getattribute__(self, "__dict__")
-                if (
-                    __dict__.get("_is_pytest_localstack", False)
-                    or key not in proxied_keys
-                ):
-                    # Don't proxy clients that are already Localstack clients
-                    return object.__getattribute__(self, key)
-                if self not in botocore.client.BaseClient._proxy_clients:
-                    try:
-                        meta = __dict__["meta"]
-                    except KeyError:
-                        raise AttributeError("meta")
-                    proxy = factory.default_session.create_client(
-                        meta.service_model.service_name,
-                        # config=config,
-                        config=__dict__["_client_config"],
-                    )
-                    botocore.client.BaseClient._proxy_clients[self] = proxy
-                return object.__getattribute__(
-                    botocore.client.BaseClient._proxy_clients[self], key
-                )
-
-            patches.append(
-                mock.patch(
-                    "botocore.client.BaseClient.__getattribute__",
-                    new_getattribute,
-                    create=True,
-                )
-            )
+            # endpoints aimed at AWS.
+            if mode == "events":
+                patches.append(_redirect_existing_clients(factory, _check_url))
+            else:
+                patches.extend(_proxy_existing_clients(factory))
 
             # STS is sneaky and even after patching the endpoint it has a final custom check
             # to see whether it should override with the global endpoint url... patch that too
@@ -322,6 +408,185 @@ class BotocoreTestResourceFactory:
                 boto3.DEFAULT_SESSION = preexisting_boto3_session
 
 
+def _proxy_existing_clients(factory):
+    """Return patches that make existing clients act like Localstack clients.
+
+    botocore.client.BaseClient is patched to forward some attributes
+    of clients that weren't created for Localstack to an equivalent
+    Localstack client.
+    """
+    patches = []
+    original_init = botocore.client.BaseClient.__init__
+
+    @functools.wraps(original_init)
+    def new_init(self, *args, **kwargs):
+        # Every client created during the patch is a Localstack client.
+        # Set this flag so that the proxy_client_attr() stuff below
+        # won't break during original_init().
+        self._is_pytest_localstack = True
+        original_init(self, *args, **kwargs)
+
+    patches.append(mock.patch.multiple(botocore.client.BaseClient, __init__=new_init))
+
+    # Create a place to store proxy clients.
+    patches.append(
+        mock.patch(
+            "botocore.client.BaseClient._proxy_clients",
+            weakref.WeakKeyDictionary(),
+            create=True,
+        )
+    )
+
+    def new_getattribute(self, key):
+        if key.startswith("__"):
+            return object.__getattribute__(self, key)
+        proxied_keys = [
+            "_cache",
+            "_client_config",
+            "_endpoint",
+            "_exceptions_factory",
+            "_exceptions",
+            "exceptions",
+            "_loader",
+            "_request_signer",
+            "_response_parser",
+            "_serializer",
+            "meta",
+        ]
+        __dict__ = object.__getattribute__(self, "__dict__")
+        if __dict__.get("_is_pytest_localstack", False) or key not in proxied_keys:
+            # Don't proxy clients that are already Localstack clients
+            return object.__getattribute__(self, key)
+        if self not in botocore.client.BaseClient._proxy_clients:
+            try:
+                meta = __dict__["meta"]
+            except KeyError:
+                raise AttributeError("meta")
+            proxy = factory.default_session.create_client(
+                meta.service_model.service_name,
+                # config=config,
+                config=__dict__["_client_config"],
+            )
+            botocore.client.BaseClient._proxy_clients[self] = proxy
+        return object.__getattribute__(
+            botocore.client.BaseClient._proxy_clients[self], key
+        )
+
+    patches.append(
+        mock.patch(
+            "botocore.client.BaseClient.__getattribute__",
+            new_getattribute,
+            create=True,
+        )
+    )
+    return patches
+
+
+@contextlib.contextmanager
+def _redirect_existing_clients(factory, check_url):
+    """Context manager that redirects the API calls of existing clients.
+
+    A ``before-call`` handler is registered on every client that wasn't
+    created for Localstack. The handler makes the call with an
+    equivalent Localstack client and returns its response, so botocore
+    skips sending the original request. It is registered last so the
+    client's own ``before-call`` handlers (and botocore Stubbers) still
+    run first. If patches are nested, only the innermost one redirects.
+
+    Args:
+        factory (:class:`BotocoreTestResourceFactory`): Creates the
+            Localstack clients.
+        check_url (callable): Called with each redirected request URL
+            to make sure it points at Localstack, or None.
+
+    """
+    clients = [
+        obj
+        for obj in gc.get_objects()
+        # Not isinstance(), which mocks of clients pass.
+        if issubclass(type(obj), botocore.client.BaseClient)
+        and not obj.__dict__.get("_is_pytest_localstack", False)
+    ]
+    logger.debug("Redirecting %i existing botocore clients", len(clients))
+    handler_id = (_REDIRECTED, next(_redirect_ids))
+    with _redirect_lock:
+        for client in clients:
+            client.__dict__.setdefault(_REDIRECTED, []).append(handler_id)
+            client.meta.events.register_last(
+                "before-call",
+                _make_redirect_handler(factory, client, check_url, handler_id),
+                unique_id=handler_id,
+            )
+    try:
+        yield
+    finally:
+        with _redirect_lock:
+            for client in clients:
+                client.meta.events.unregister("before-call", unique_id=handler_id)
+                handler_ids = client.__dict__.get(_REDIRECTED, [])
+                if handler_id in handler_ids:
+                    handler_ids.remove(handler_id)
+                if not handler_ids:
+                    client.__dict__.pop(_REDIRECTED, None)
+
+
+def _make_url_check(localstack_session, host_check):
+    """Return a function that asserts a request URL points at Localstack.
+
+    The allowed hosts are the Localstack hostname, this machine's
+    hostname and their subdomains (for operations with a host prefix).
+
+    Returns:
+        A callable, or None if `host_check` is ``"off"``.
+
+    """
+    if host_check == "off":
+        return None
+    allowed_hosts = {localstack_session.hostname.lower(), socket.gethostname().lower()}
+    allowed_suffixes = tuple("." + host for host in allowed_hosts)
+    # Requests mostly go to a handful of URL authorities, so ones that
+    # passed are remembered and only other URLs are fully parsed.
+    allowed_netlocs = set()
+    counter = itertools.count()
+
+    def _check_url(url):
+        if host_check == "sampled" and next(counter) % HOST_CHECK_SAMPLE_RATE:
+            return
+        parts = url.split("/", 3)
+        netloc = parts[2] if len(parts) > 2 else None
+        if netloc in allowed_netlocs:
+            return
+        host = urllib.parse.urlsplit(url).hostname or ""
+        assert host in allowed_hosts or host.endswith(allowed_suffixes), (
+            "%s doesn't point at Localstack" % url
+        )
+        if netloc is not None:
+            allowed_netlocs.add(netloc)
+
+    return _check_url
+
+
+def _make_redirect_handler(factory, client, check_url, handler_id):
+    proxies = []
+
+    def _before_call(model, params, context=None, **kwargs):
+        if client.__dict__.get(_REDIRECTED, [None])[-1] != handler_id:
+            return None  # A nested patch redirects the call.
+        if not proxies:
+            proxies.append(
+                factory.default_session.create_client(
+                    model.service_model.service_name, config=client._client_config
+                )
+            )
+        proxy = proxies[0]
+        prepare_request_dict(params, endpoint_url=proxy._endpoint.host, context=context)
+        if check_url is not None:
+            check_url(params["url"])
+        return proxy._make_request(model, params, context)
+
+    return _before_call
+
+
 def patch_fixture(
     scope="function",
     services=None,
@@ -335,6 +600,7 @@ def patch_fixture(
     auto_remove=True,
     pull_image=True,
     container_name=None,
+    reset=False,
     **kwargs
 ):
     """Create a pytest fixture that temporarially redirects all botocore
@@ -381,10 +647,18 @@ def patch_fixture(
             image to use. Defaults to :const:`"latest"`.
         auto_remove (bool, optional): If :obj:`True`, delete the Localstack
             container when it stops. Default: :obj:`True`
-        pull_image (bool, optional): If :obj:`True`, pull the Localstack
-            image before running it. Default: :obj:`True`
+        pull_image (bool, str, optional): When to pull the Localstack
+            image, see :class:`.LocalstackSession` for the pull policies.
+            Overridden by the ``--localstack-pull-policy`` option.
+            Default: :obj:`True`
         container_name (str, optional): The name for the Localstack
             container. Defaults to a randomly generated id.
+        reset (bool, optional): If :obj:`True`, start one Localstack
+            container for the whole test run and wipe its state each
+            time the fixture is set up instead of starting a new
+            container, see :meth:`.RunningSession.reset`. Fixtures
+            with ``reset`` don't use ``--localstack-share``.
+            Default: :obj:`False`
         **kwargs: Additional kwargs will be passed to the
             :class:`.LocalstackSession`.
 
@@ -393,23 +667,26 @@ def patch_fixture(
 
     """
 
+    session_kwargs = dict(
+        docker_client=docker_client,
+        services=services,
+        region_name=region_name,
+        kinesis_error_probability=kinesis_error_probability,
+        dynamodb_error_probability=dynamodb_error_probability,
+        container_log_level=container_log_level,
+        localstack_version=localstack_version,
+        auto_remove=auto_remove,
+        pull_image=pull_image,
+        container_name=container_name,
+        **kwargs
+    )
+    _declare_session(**session_kwargs)
+
     @pytest.fixture(scope=scope, autouse=autouse)
     def _fixture(pytestconfig):
         if not pytestconfig.pluginmanager.hasplugin("localstack"):
             pytest.skip("skipping because localstack plugin isn't loaded")
-        with _make_session(
-            docker_client=docker_client,
-            services=services,
-            region_name=region_name,
-            kinesis_error_probability=kinesis_error_probability,
-            dynamodb_error_probability=dynamodb_error_probability,
-            container_log_level=container_log_level,
-            localstack_version=localstack_version,
-            auto_remove=auto_remove,
-            pull_image=pull_image,
-            container_name=container_name,
-            **kwargs
-        ) as session:
+        with _make_session(reset=reset, **session_kwargs) as session:
             with session.botocore.patch_botocore():
                 yield session
 
@@ -420,12 +697,38 @@ def patch_fixture(
 _original_create_client = utils.unbind(botocore.session.Session.create_client)
 
 
+# Localstack doesn't use the virtual host addressing style.
+_PATH_STYLE_CONFIG = botocore.config.Config(s3={"addressing_style": "path"})
+
+# botocore.session.Session.create_client's signature, without `self`.
+_CREATE_CLIENT_SIGNATURE = inspect.signature(
+    functools.partial(_original_create_client, None)
+)
+
+# Position of `config` in create_client's positional arguments.
+_CREATE_CLIENT_CONFIG_INDEX = list(_CREATE_CLIENT_SIGNATURE.parameters).index("config")
+
+
 class Session(botocore.session.Session):
-    """A botocore Session subclass that talks to Localstack."""
+    """A botocore Session subclass that talks to Localstack.
+
+    Clients can be created from several threads at once.
+    """
 
     def __init__(self, localstack_session, *args, **kwargs):
         self.localstack_session = localstack_session
+        self._components_lock = threading.Lock()
+        self._components_loaded = False
         super(Session, self).__init__(*args, **kwargs)
+        # Localstack has no global STS endpoint, so STS clients must use
+        # the regional one that points at Localstack.
+        self.set_config_variable("sts_regional_endpoints", "regional")
+
+    def _register_data_loader(self):
+        self._components.lazy_register_component(
+            "data_loader",
+            lambda: get_shared_loader(self.get_config_variable("data_path")),
+        )
 
     def _register_endpoint_resolver(self):
         def create_default_resolver():
@@ -447,23 +750,212 @@ class Session(botocore.session.Session):
             "credential_provider", create_credential_resolver
         )
 
+    def _load_components(self):
+        """Create the lazily registered components clients need.
+
+        botocore's lazy component creation isn't thread-safe,
+        so it's done once, under a lock.
+        """
+        with self._components_lock:
+            if self._components_loaded:
+                return
+            self.get_component("data_loader")
+            self.get_credentials()
+            if constants.BOTOCORE_VERSION >= (1, 10, 58):
+                self._get_internal_component("endpoint_resolver")
+                try:
+                    self._get_internal_component("monitor")
+                except ValueError:
+                    pass  # botocore is too old to have client monitoring.
+            else:
+                self.get_component("endpoint_resolver")
+            self._components_loaded = True
+
     def create_client(self, *args, **kwargs):
         """Create a botocore client."""
-        # Localstack doesn't use the virtual host addressing style.
-        config = botocore.config.Config(s3={"addressing_style": "path"})
-        callargs = inspect.getcallargs(_original_create_client, self, *args, **kwargs)
-        if callargs.get("config"):
-            config = callargs["config"].merge(config)
-        callargs["config"] = config
-        with mock.patch(
-            "botocore.args.ClientArgsCreator._should_set_global_sts_endpoint",
-            lambda *args, **kwargs: False,
-        ):
-            client = _original_create_client(**callargs)
+        # patch_botocore() also uses this method for plain botocore Sessions.
+        if not getattr(self, "_components_loaded", True):
+            self._load_components()
+        if len(args) > _CREATE_CLIENT_CONFIG_INDEX:
+            args = list(args)
+            config = args[_CREATE_CLIENT_CONFIG_INDEX]
+            args[_CREATE_CLIENT_CONFIG_INDEX] = (
+                config.merge(_PATH_STYLE_CONFIG) if config else _PATH_STYLE_CONFIG
+            )
+        else:
+            config = kwargs.get("config")
+            kwargs["config"] = (
+                config.merge(_PATH_STYLE_CONFIG) if config else _PATH_STYLE_CONFIG
+            )
+        client = _original_create_client(self, *args, **kwargs)
         client._is_pytest_localstack = True
         return client
 
 
+class _SizeRecordingFileLoader(botocore.loaders.JSONFileLoader):
+    """A JSONFileLoader that records the size of each file it parses."""
+
+    def __init__(self):
+        self.file_sizes = {}
+
+    def load_file(self, file_path):
+        data = super(_SizeRecordingFileLoader, self).load_file(file_path)
+        if data is not None:
+            for full_path in (file_path + ".json", file_path + ".json.gz"):
+                if os.path.isfile(full_path):
+                    self.file_sizes[full_path] = os.path.getsize(full_path)
+                    break
+        return data
+
+
+class _SearchPaths(list):
+    """A list of search paths that ignores paths it already has."""
+
+    def append(self, path):
+        if path not in self:
+            super(_SearchPaths, self).append(path)
+
+
+class SharedLoader(botocore.loaders.Loader):
+    """A thread-safe botocore Loader shared by Localstack sessions.
+
+    Everything it loads is cached for the life of the process, so each
+    JSON data file is parsed at most once however many sessions and
+    fixtures there are. The loaded data is shared, so it must be
+    treated as read-only.
+    """
+
+    FILE_LOADER_CLASS = _SizeRecordingFileLoader
+
+    def __init__(self, *args, **kwargs):
+        super(SharedLoader, self).__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+        # Every boto3 Session appends its data path to its loader.
+        self._search_paths = _SearchPaths(self._search_paths)
+
+    def list_available_services(self, *args, **kwargs):
+        with self._lock:
+            return super(SharedLoader, self).list_available_services(*args, **kwargs)
+
+    def determine_latest_version(self, *args, **kwargs):
+        with self._lock:
+            return super(SharedLoader, self).determine_latest_version(*args, **kwargs)
+
+    def list_api_versions(self, *args, **kwargs):
+        with self._lock:
+            return super(SharedLoader, self).list_api_versions(*args, **kwargs)
+
+    def load_service_model(self, *args, **kwargs):
+        with self._lock:
+            return super(SharedLoader, self).load_service_model(*args, **kwargs)
+
+    def load_data(self, *args, **kwargs):
+        with self._lock:
+            return super(SharedLoader, self).load_data(*args, **kwargs)
+
+
+_shared_loaders = {}
+_shared_loaders_lock = threading.Lock()
+_shared_loader_uses = collections.Counter()
+
+
+def get_shared_loader(data_path=None):
+    """Return the process-wide :class:`SharedLoader` for a data path.
+
+    Args:
+        data_path (str, optional): Extra search paths, like the
+            ``AWS_DATA_PATH`` environment variable.
+
+    """
+    with _shared_loaders_lock:
+        _shared_loader_uses[data_path] += 1
+        if data_path not in _shared_loaders:
+            extra_search_paths = None
+            if data_path is not None:
+                extra_search_paths = [
+                    os.path.expanduser(os.path.expandvars(path))
+                    for path in data_path.split(os.pathsep)
+                ]
+            _shared_loaders[data_path] = SharedLoader(
+                extra_search_paths=extra_search_paths
+            )
+        return _shared_loaders[data_path]
+
+
+def shared_loader_report():
+    """Describe the data loaded by the shared botocore loaders.
+
+    Returns:
+        A ``(files, uses)`` tuple. `files` is a list of
+        ``(path, size in bytes)`` tuples for the JSON files that were
+        parsed, largest first. `uses` is how many botocore sessions
+        used a shared loader.
+
+    """
+    with _shared_loaders_lock:
+        loaders = list(_shared_loaders.values())
+        uses = sum(_shared_loader_uses.values())
+    files = {}
+    for loader in loaders:
+        files.update(loader.file_loader.file_sizes)
+    return sorted(files.items(), key=lambda item: item[1], reverse=True), uses
+
+
+def client_cache(localstack_session):
+    """Return a client cache sized by the session's ``client_cache_size``.
+
+    Returns:
+        A :class:`pytest_localstack.utils.LRUCache`, or None if client
+        caching isn't enabled.
+
+    """
+    size = getattr(localstack_session, "client_cache_size", None)
+    if not size:
+        return None
+    return utils.LRUCache(size)
+
+
+def client_cache_key(signature, *args, **kwargs):
+    """Return a hashable key for client creation arguments.
+
+    Arguments are bound to `signature` with defaults applied, so the
+    same arguments give the same key whether they are passed by
+    position or by keyword. botocore Config objects are compared by
+    the options they were created with.
+
+    Args:
+        signature (:class:`inspect.Signature`): The signature of the
+            function that creates the client.
+
+    Raises:
+        TypeError: If the arguments don't match `signature`.
+
+    """
+
+    def _normalize(value):
+        if isinstance(value, botocore.config.Config):
+            options = value._user_provided_options
+            return ("Config", tuple(sorted((k, repr(options[k])) for k in options)))
+        try:
+            hash(value)
+        except TypeError:
+            return repr(value)
+        return value
+
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    key = []
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            value = tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+        elif signature.parameters[name].kind is inspect.Parameter.VAR_POSITIONAL:
+            value = tuple(_normalize(v) for v in value)
+        else:
+            value = _normalize(value)
+        key.append((name, value))
+    return tuple(key)
+
+
 def create_credential_resolver():
     """Create a credentials resolver for Localstack."""
     env_provider = botocore.credentials.EnvProvider()
@@ -490,16 +982,32 @@ class DefaultCredentialProvider(botocore.credentials.CredentialProvider):
 
 
 class LocalstackEndpointResolver(botocore.regions.EndpointResolver):
-    """Resolve AWS service endpoints based on a LocalstackSession."""
+    """Resolve AWS service endpoints based on a LocalstackSession.
+
+    The endpoints of the 'aws' partition are indexed by service name
+    when the resolver is created, and resolved endpoints are cached.
+    Only the hostname is filled in on each call, since the Localstack
+    port can change when the session is restarted.
+    """
 
     def __init__(self, localstack_session, endpoints):
         self.localstack_session = localstack_session
         super(LocalstackEndpointResolver, self).__init__(endpoints)
+        self._valid_regions = frozenset([localstack_session.region_name, "aws-global"])
+        self._partition = None
+        self._service_endpoints = {}
+        for partition in self._endpoint_data["partitions"]:
+            if partition["partition"] == "aws":
+                self._partition = partition
+                for service_name, service in partition["services"].items():
+                    self._service_endpoints[service_name] = list(service["endpoints"])
+                break
+        self._endpoints = {}
 
     @property
     def valid_regions(self):
-        """Return a list of regions we can resolve endpoints for."""
-        return set([self.localstack_session.region_name, "aws-global"])
+        """Return a set of regions we can resolve endpoints for."""
+        return self._valid_regions
 
     def get_available_partitions(self):
         """List the partitions available to the endpoint resolver."""
@@ -511,38 +1019,45 @@ class LocalstackEndpointResolver(botocore.regions.EndpointResolver):
         """List the endpoint names of a particular partition."""
         if partition_name != "aws":
             raise exceptions.UnsupportedPartitionError(partition_name)
-        result = []
-        for partition in self._endpoint_data["partitions"]:
-            if partition["partition"] != "aws":
-                continue
-            services = partition["services"]
-            if service_name not in services:
-                continue
-            for endpoint_name in services[service_name]["endpoints"]:
-                if allow_non_regional or endpoint_name in self.valid_regions:
-                    result.append(endpoint_name)
-        return result
+        endpoint_names = self._service_endpoints.get(service_name, [])
+        if allow_non_regional:
+            return list(endpoint_names)
+        return [name for name in endpoint_names if name in self._valid_regions]
 
     def construct_endpoint(self, service_name, region_name=None):
         """Resolve an endpoint for a service and region combination."""
         if region_name is None:
             region_name = self.localstack_session.region_name
-        elif region_name not in self.valid_regions:
+        elif region_name not in self._valid_regions:
             raise exceptions.RegionError(
                 region_name, self.localstack_session.region_name
             )
-        for partition in self._endpoint_data["partitions"]:
-            if partition["partition"] != "aws":
-                continue
-            result = self._endpoint_for_partition(partition, service_name, region_name)
-            if result:
-                result["hostname"] = self.localstack_session.service_hostname(
-                    service_name
-                )
-                result["protocols"] = (
-                    result["protocols"] if self.localstack_session.use_ssl else ["http"]
-                )
-                if not self.localstack_session.use_ssl:
-                    result.pop("sslCommonName", None)
-                result["dnsSuffix"] = self.localstack_session.hostname
-                return result
+        key = (service_name, region_name)
+        try:
+            endpoint = self._endpoints[key]
+        except KeyError:
+            endpoint = self._endpoints[key] = self._resolve_endpoint(
+                service_name, region_name
+            )
+        if endpoint is None:
+            return None
+        result = dict(endpoint)
+        result["hostname"] = self.localstack_session.service_hostname(service_name)
+        return result
+
+    def _resolve_endpoint(self, service_name, region_name):
+        if self._partition is None:
+            return None
+        # botocore builds the result from, and partly into, the shared
+        # endpoint data, so keep a copy of our own.
+        result = self._endpoint_for_partition(
+            self._partition, service_name, region_name
+        )
+        if not result:
+            return None
+        result = copy.deepcopy(result)
+        if not self.localstack_session.use_ssl:
+            result["protocols"] = ["http"]
+            result.pop("sslCommonName", None)
+        result["dnsSuffix"] = self.localstack_session.hostname
+        return result
@@ -25,6 +25,14 @@ class ServiceError(Error):
         super(ServiceError, self).__init__(msg, *args, **kwargs)
 
 
+class HealthEndpointNotFoundError(ServiceError):
+    """Raised when Localstack doesn't have a health endpoint."""
+
+    def __init__(self, url, *args, **kwargs):
+        msg = "No Localstack health endpoint found at {0}".format(url)
+        super(HealthEndpointNotFoundError, self).__init__(msg, *args, **kwargs)
+
+
 class ContainerAlreadyStartedError(Error):
     """Raised when :class:`~.LocalstackSession` container is started twice."""
 
@@ -41,6 +41,34 @@ def session_started(session):
     """Hook fired when :class:`LocalstackSession` has started."""
 
 
+@pytest_localstack_hookspec
+def session_phase_timed(session, phase, duration):
+    """Hook fired when a phase of starting :class:`LocalstackSession` is done.
+
+    `duration` is the time in seconds the phase took.
+    See :class:`~pytest_localstack.session.Timeline` for the phases.
+    """
+
+
+@pytest_localstack_hookspec
+def session_service_ready(session, service_name, elapsed):
+    """Hook fired when a Localstack service becomes available.
+
+    `elapsed` is the time in seconds since service checks started.
+    """
+
+
+@pytest_localstack_hookspec
+def session_warm_up(session):
+    """Hook to prepare test resource factories after a session started.
+
+    Only called for sessions created with ``warm_up=True``, on a
+    background thread, so tests may already be running. Implementations
+    should return early once ``session.warm_up_cancelled`` is set, which
+    happens when the session stops.
+    """
+
+
 @pytest_localstack_hookspec
 def session_stopping(session):
     """Hook fired when :class:`LocalstackSession` is stopping."""
@@ -49,3 +77,12 @@ def session_stopping(session):
 @pytest_localstack_hookspec
 def session_stopped(session):
     """Hook fired when :class:`LocalstackSession` has stopped."""
+
+
+@pytest_localstack_hookspec
+def terminal_summary(terminalreporter):
+    """Hook to add to the summary at the end of a pytest run.
+
+    `terminalreporter` is pytest's
+    :class:`~_pytest.terminal.TerminalReporter`.
+    """
@@ -0,0 +1,203 @@
+"""Find and remove Localstack containers left behind by dead test runs.
+
+:class:`.LocalstackSession` labels every container it starts with the
+process that owns it, the host it runs on, when it started and how long
+it may live (see :func:`container_labels`). A container is left behind
+when its test run is killed before it can stop the container, for
+example when a CI job is cancelled.
+
+A container is an orphan if it has outlived its TTL, or if its owner
+process ran on this host, in this PID namespace, and no longer exists.
+Containers kept with ``--localstack-reuse`` outlive their owner on
+purpose; they are orphans once they have been idle for longer than
+their idle TTL (see :mod:`pytest_localstack.reuse`).
+
+Run ``pytest-localstack reap`` (or ``python -m pytest_localstack reap``)
+to remove orphans by hand.
+"""
+import argparse
+import concurrent.futures
+import logging
+import os
+import socket
+import time
+
+from pytest_localstack import constants, reuse
+
+logger = logging.getLogger(__name__)
+
+
+def container_labels(owner_pid=None, ttl=constants.DEFAULT_CONTAINER_TTL):
+    """Return the labels for a new Localstack container.
+
+    Args:
+        owner_pid (int, optional): The process that will stop the
+            container. Defaults to this process.
+        ttl (float, optional): Seconds after which the container may be
+            removed even if its owner is still running. None for never.
+            Default: :data:`constants.DEFAULT_CONTAINER_TTL`
+
+    Returns:
+        dict: Label names to values.
+
+    """
+    return {
+        constants.LABEL_PID: str(os.getpid() if owner_pid is None else owner_pid),
+        constants.LABEL_HOST: socket.gethostname(),
+        constants.LABEL_PID_NAMESPACE: _pid_namespace(),
+        constants.LABEL_STARTED: str(int(time.time())),
+        constants.LABEL_TTL: "" if ttl is None else str(int(ttl)),
+    }
+
+
+def orphan_reason(labels, now=None):
+    """Return why a container is an orphan, or None if it isn't.
+
+    Args:
+        labels (dict): The container's labels.
+        now (float, optional): The current time. Defaults to :func:`time.time`.
+
+    Returns:
+        str or None
+
+    """
+    now = time.time() if now is None else now
+    try:
+        started = int(labels[constants.LABEL_STARTED])
+        ttl = labels.get(constants.LABEL_TTL)
+        if ttl and now - started > int(ttl):
+            return "expired"
+        idle_ttl = labels.get(constants.LABEL_IDLE_TTL)
+        if idle_ttl:
+            last_used = reuse.last_used(labels.get(constants.LABEL_CONFIG))
+            if now - (last_used or started) > int(idle_ttl):
+                return "idle"
+            return None
+        pid = int(labels[constants.LABEL_PID])
+    except (KeyError, ValueError):
+        return None
+    if labels.get(constants.LABEL_HOST) != socket.gethostname():
+        return None  # The owner's PID means nothing here.
+    if labels.get(constants.LABEL_PID_NAMESPACE) != _pid_namespace():
+        return None  # Nor in another container on this host.
+    if not _pid_exists(pid):
+        return "owner %i exited" % pid
+    return None
+
+
+def _pid_namespace():
+    """Return an id of this process's PID namespace, or "" if unknown."""
+    try:
+        return str(os.stat("/proc/self/ns/pid").st_ino)
+    except OSError:
+        return ""  # Not Linux, so there are no PID namespaces.
+
+
+def _pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # It exists, but belongs to someone else.
+    return True
+
+
+def find_orphans(docker_client, include_all=False):
+    """Find orphaned Localstack containers.
+
+    Args:
+        docker_client (:class:`~docker.client.DockerClient`): The Docker
+            client to search with.
+        include_all (bool, optional): Return every labeled container,
+            orphaned or not. Default: False
+
+    Returns:
+        list: ``(container, reason)`` tuples.
+
+    """
+    containers = docker_client.containers.list(
+        all=True, filters={"label": constants.LABEL_PID}
+    )
+    orphans = []
+    now = time.time()
+    for container in containers:
+        reason = orphan_reason(container.labels, now=now)
+        if reason is None and include_all:
+            reason = "all"
+        if reason is not None:
+            orphans.append((container, reason))
+    return orphans
+
+
+def remove_orphans(docker_client, include_all=False, dry_run=False, max_workers=8):
+    """Find orphaned Localstack containers and remove them concurrently.
+
+    Args:
+        docker_client (:class:`~docker.client.DockerClient`): The Docker
+            client to use.
+        include_all (bool, optional): Remove every labeled container,
+            orphaned or not. Default: False
+        dry_run (bool, optional): Only find the orphans. Default: False
+        max_workers (int, optional): The maximum number of containers
+            to remove at once. Default: 8
+
+    Returns:
+        list: ``(container, reason)`` tuples of the containers removed.
+
+    """
+    orphans = find_orphans(docker_client, include_all=include_all)
+    if dry_run or not orphans:
+        return orphans
+    removed = []
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(orphans)),
+        thread_name_prefix="localstack-orphans",
+    ) as executor:
+        futures = {
+            executor.submit(container.remove, force=True): (container, reason)
+            for container, reason in orphans
+        }
+        for future in concurrent.futures.as_completed(futures):
+            container, reason = futures[future]
+            try:
+                future.result()
+            except Exception:
+                # It may have stopped and removed itself in the meantime.
+                logger.debug("Failed to remove %s", container.name, exc_info=True)
+            else:
+                logger.info(
+                    "Removed orphaned container %s (%s)", container.name, reason
+                )
+                removed.append((container, reason))
+    return removed
+
+
+def main(argv=None):
+    """The ``pytest-localstack`` command."""
+    parser = argparse.ArgumentParser(prog="pytest-localstack")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+    reap_parser = subparsers.add_parser(
+        "reap", help="remove Localstack containers left behind by dead test runs"
+    )
+    reap_parser.add_argument(
+        "--all",
+        action="store_true",
+        dest="include_all",
+        help="remove every pytest-localstack container, even in-use ones",
+    )
+    reap_parser.add_argument(
+        "--dry-run", action="store_true", help="only list the containers"
+    )
+    args = parser.parse_args(argv)
+
+    import docker
+
+    docker_client = docker.from_env()
+    removed = remove_orphans(
+        docker_client, include_all=args.include_all, dry_run=args.dry_run
+    )
+    for container, reason in removed:
+        print("%s %s (%s)" % (container.short_id, container.name, reason))
+    return 0
@@ -4,6 +4,8 @@
 
 """
 import importlib
+import sys
+import threading
 
 import pluggy
 
@@ -12,6 +14,10 @@ import pytest_localstack.hookspecs
 manager = pluggy.PluginManager("pytest-localstack")
 manager.add_hookspecs(pytest_localstack.hookspecs)
 
+_default_plugins_lock = threading.RLock()
+_default_plugins_loaded = False
+_default_plugins_loading = False
+
 
 def register_plugin_module(module_path, required=True):
     """Register hooks in a module with the PluginManager by Python path.
@@ -34,5 +40,38 @@ def register_plugin_module(module_path, required=True):
         if required:
             raise
     else:
-        manager.register(module)
+        if not manager.is_registered(module):
+            manager.register(module)
         return module
+
+
+def load_default_plugins():
+    """Register the contrib and 3rd-party plugin modules.
+
+    The plugins import botocore, boto3 and whatever else they wrap,
+    so this is deferred until something needs them; every pytest run
+    loads :mod:`pytest_localstack`, even ones that don't use Localstack.
+    Only the first successful call does anything; if a plugin fails
+    to register, the next call tries again.
+    """
+    global _default_plugins_loaded, _default_plugins_loading
+    with _default_plugins_lock:
+        # The plugins may import pytest_localstack while they're loaded.
+        if _default_plugins_loaded or _default_plugins_loading:
+            return
+        _default_plugins_loading = True
+        try:
+            # Register contrib modules
+            register_plugin_module("pytest_localstack.contrib.botocore")
+            register_plugin_module("pytest_localstack.contrib.boto3", False)
+
+            # Register 3rd-party modules
+            manager.load_setuptools_entrypoints("localstack")
+        finally:
+            _default_plugins_loading = False
+        _default_plugins_loaded = True
+
+        # Trigger pytest_localstack_contribute_to_module hook
+        manager.hook.contribute_to_module.call_historic(
+            kwargs={"pytest_localstack": sys.modules["pytest_localstack"]}
+        )
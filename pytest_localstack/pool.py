@@ -0,0 +1,103 @@
+"""Reuse started Localstack sessions between fixtures.
+
+Starting a Localstack container is by far the slowest part of a test
+using pytest-localstack. Fixtures that ask for identically configured
+containers can share one instead of each starting their own.
+"""
+import collections
+import hashlib
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def config_key(*args, **kwargs):
+    """Return a stable hash of :class:`.LocalstackSession` parameters.
+
+    Sessions created from parameters with equal keys run identically
+    configured containers, so one can stand in for another.
+    """
+    normalized = dict(kwargs)
+    if normalized.get("services") is not None:
+        normalized["services"] = sorted(normalized["services"])
+    data = json.dumps([args, normalized], sort_keys=True, default=repr)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class SessionPool:
+    """A process-wide pool of started Localstack sessions.
+
+    Sessions are grouped by a key (see :func:`config_key`).
+    :meth:`acquire` hands out an idle session with a matching key,
+    only starting a new one if there isn't any. :meth:`release` returns
+    a session to the pool instead of stopping it.
+
+    Sessions keep whatever state the previous user left in them.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(list)
+        self._keys = {}
+
+    def acquire(self, key, factory):
+        """Get a started session for `key`.
+
+        Args:
+            key (str): The session configuration key.
+            factory (callable): Called without arguments to create and
+                start a new session if the pool has no idle session
+                for `key`.
+
+        Returns:
+            A started session.
+
+        """
+        with self._lock:
+            idle = self._idle[key]
+            if idle:
+                session = idle.pop()
+                logger.debug("Reusing pooled session %r", session)
+                return session
+        session = factory()
+        with self._lock:
+            self._keys[session] = key
+        logger.debug("Added session %r to pool", session)
+        return session
+
+    def release(self, session):
+        """Return a session acquired with :meth:`acquire` to the pool."""
+        with self._lock:
+            self._idle[self._keys[session]].append(session)
+
+    def discard(self, session):
+        """Forget about a session without returning it to the pool."""
+        with self._lock:
+            key = self._keys.pop(session, None)
+            if key is not None and session in self._idle[key]:
+                self._idle[key].remove(session)
+
+    def close(self, timeout=10, reaper=None):
+        """Stop every session in the pool.
+
+        Args:
+            timeout (float, optional): Passed to each session's `stop()`.
+                Default: 10
+            reaper (:class:`.ContainerReaper`, optional): Stop the
+                sessions' containers with this reaper instead of waiting
+                for each one to stop.
+
+        """
+        with self._lock:
+            sessions = list(self._keys)
+            self._keys.clear()
+            self._idle.clear()
+        for session in sessions:
+            logger.debug("Stopping pooled session %r", session)
+            if reaper is not None and hasattr(session, "detach"):
+                session.stop(timeout=timeout, reaper=reaper)
+            else:
+                session.stop(timeout=timeout)
@@ -0,0 +1,210 @@
+"""Keep Localstack containers running between pytest invocations.
+
+With ``--localstack-reuse``, containers aren't stopped at the end of
+the test run. Each is labelled with the hash of its configuration
+(see :func:`pytest_localstack.pool.config_key`), and later test runs
+with the same configuration attach to it as a :class:`.RunningSession`
+instead of starting a new container. Its state is reset before each use.
+
+A reused container is removed as an orphan
+(see :mod:`pytest_localstack.orphans`) once no test run has used it for
+its idle TTL. The time a container was last used is the modification
+time of a file in :data:`STATE_DIR`.
+"""
+import itertools
+import logging
+import os
+import tempfile
+import threading
+
+from pytest_localstack import constants, shared
+
+logger = logging.getLogger(__name__)
+
+# Where the last use of each reused container is recorded.
+STATE_DIR = os.path.join(tempfile.gettempdir(), "pytest-localstack")
+
+
+def _used_path(key):
+    return os.path.join(STATE_DIR, "reuse-%s.used" % key)
+
+
+def touch(key):
+    """Record that the container for `key` was used just now."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(_used_path(key), "a"):
+        pass
+    os.utime(_used_path(key))
+
+
+def last_used(key):
+    """Return when the container for `key` was last used, or None."""
+    try:
+        return os.path.getmtime(_used_path(key))
+    except OSError:
+        return None
+
+
+def container_labels(key, idle_ttl=constants.DEFAULT_REUSE_IDLE_TTL):
+    """Return the extra labels for a reusable container.
+
+    Args:
+        key (str): The container configuration key.
+        idle_ttl (float, optional): Seconds the container may go unused
+            before it is removed. Default: 30 minutes
+
+    Returns:
+        dict: Label names to values.
+
+    """
+    return {constants.LABEL_CONFIG: key, constants.LABEL_IDLE_TTL: str(int(idle_ttl))}
+
+
+def find_container(docker_client, key):
+    """Return a running reusable container for `key`, or None."""
+    containers = docker_client.containers.list(
+        filters={"label": "%s=%s" % (constants.LABEL_CONFIG, key), "status": "running"}
+    )
+    return containers[0] if containers else None
+
+
+class ReusedSessions:
+    """The reusable sessions used by this process.
+
+    Like :class:`~pytest_localstack.pool.SessionPool`, :meth:`acquire`
+    hands out a session no one else is using, and :meth:`release`
+    returns it. Fixtures that use identically configured sessions at
+    the same time get containers of their own, each kept under its own
+    key (the configuration key, then ``<key>-2``, ``<key>-3``, ...).
+    Sessions are held until :meth:`close`, which leaves the containers
+    running. Held containers are marked as used whenever they are
+    acquired or released, and every `touch_interval` seconds in the
+    background, so they aren't removed as idle during a long test run.
+
+    Args:
+        idle_ttl (float, optional): The idle TTL of new containers.
+            Default: 30 minutes
+        touch_interval (float, optional): Seconds between marking held
+            containers as used. Default: a third of `idle_ttl`
+
+    Raises:
+        ValueError: If `idle_ttl` or `touch_interval` isn't positive.
+
+    """
+
+    def __init__(self, idle_ttl=constants.DEFAULT_REUSE_IDLE_TTL, touch_interval=None):
+        if idle_ttl <= 0:
+            raise ValueError("idle_ttl must be positive, not %r" % (idle_ttl,))
+        if touch_interval is not None and touch_interval <= 0:
+            raise ValueError(
+                "touch_interval must be positive, not %r" % (touch_interval,)
+            )
+        self.idle_ttl = idle_ttl
+        self.touch_interval = idle_ttl / 3 if touch_interval is None else touch_interval
+        self._sessions = {}
+        self._in_use = set()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._toucher = None
+
+    def acquire(self, key, docker_client, start_session, attach_session):
+        """Return a session for `key` that isn't in use.
+
+        Arguments are the same as :meth:`get`. Pass the session to
+        :meth:`release` once you're done with it.
+        """
+        with self._lock:
+            slot = next(
+                slot
+                for slot in itertools.chain(
+                    [key], ("%s-%i" % (key, i) for i in itertools.count(2))
+                )
+                if slot not in self._in_use
+            )
+            self._in_use.add(slot)
+        try:
+            return self.get(slot, docker_client, start_session, attach_session)
+        except BaseException:
+            with self._lock:
+                self._in_use.discard(slot)
+            raise
+
+    def release(self, session):
+        """Return a session acquired with :meth:`acquire`."""
+        with self._lock:
+            slot = next(k for k, held in self._sessions.items() if held is session)
+            self._in_use.discard(slot)
+        touch(slot)
+
+    def get(self, key, docker_client, start_session, attach_session):
+        """Return this process's session for `key`.
+
+        The session may be in use elsewhere; see :meth:`acquire`.
+
+        Args:
+            key (str): The container configuration key.
+            docker_client: A docker-py Client object to find
+                containers with.
+            start_session (callable): Called with a dict of extra
+                container labels to start a new :class:`.LocalstackSession`
+                if there is no container to reuse.
+            attach_session (callable): Called with a container to create
+                and start a session connected to it.
+
+        Returns:
+            A started session.
+
+        """
+        if key in self._sessions:
+            touch(key)
+            return self._sessions[key]
+        os.makedirs(STATE_DIR, exist_ok=True)
+        # Don't start two containers for one key in concurrent test runs.
+        with shared.SharedContainer(STATE_DIR, "reuse-" + key).locked():
+            session = None
+            container = find_container(docker_client, key)
+            if container is not None:
+                try:
+                    session = attach_session(container)
+                except Exception:
+                    logger.warning(
+                        "Replacing unusable container %s",
+                        container.short_id,
+                        exc_info=True,
+                    )
+                    container.remove(force=True)
+                else:
+                    logger.debug("Reusing container %s", container.short_id)
+            if session is None:
+                session = start_session(container_labels(key, self.idle_ttl))
+            touch(key)
+        with self._lock:
+            self._sessions[key] = session
+        if self._toucher is None:
+            self._toucher = threading.Thread(
+                target=self._touch_held, name="localstack-reuse-touch", daemon=True
+            )
+            self._toucher.start()
+        return session
+
+    def _touch_held(self):
+        while not self._closed.wait(self.touch_interval):
+            with self._lock:
+                keys = list(self._sessions)
+            for key in keys:
+                touch(key)
+
+    def close(self, timeout=10):
+        """Let go of every session, leaving their containers running."""
+        self._closed.set()
+        if self._toucher is not None:
+            self._toucher.join()
+            self._toucher = None
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+            self._in_use.clear()
+        for key, session in sessions.items():
+            if hasattr(session, "detach"):
+                session.detach()
+            session.stop(timeout=timeout)
+            touch(key)
@@ -3,15 +3,22 @@
 Each check takes a :class:`.LocalstackSession` and
 raises :class:`~pytest_localstack.exceptions.ServiceError`
 if the service is not available.
+
+:class:`HealthCheck` instead asks Localstack about all of its
+services at once.
 """
 import contextlib
 import functools
+import http.client
+import json
 import socket
+import ssl
+import time
 import urllib.parse
 
 import botocore.config
 
-from pytest_localstack import constants, exceptions
+from pytest_localstack import constants, exceptions, utils
 
 
 def is_port_open(port_or_url, timeout=1):
@@ -30,6 +37,119 @@ def is_port_open(port_or_url, timeout=1):
         return result == 0
 
 
+def edge_connection(localstack_session, timeout=1):
+    """Return an HTTP connection to a Localstack session's edge port.
+
+    Args:
+        localstack_session (:class:`.RunningSession`): The session to
+            connect to.
+        timeout (float, optional): Connection and read timeout in seconds.
+            Default: 1
+
+    Returns:
+        :class:`http.client.HTTPConnection`: An unopened connection,
+        using HTTPS if the session does.
+
+    """
+    url = urllib.parse.urlsplit(localstack_session.endpoint_url(None))
+    if url.scheme == "https":
+        # Localstack uses a self-signed certificate.
+        return http.client.HTTPSConnection(
+            url.hostname,
+            url.port,
+            timeout=timeout,
+            context=ssl._create_unverified_context(),
+        )
+    return http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+
+
+class HealthCheck:
+    """Check Localstack services via its health endpoint.
+
+    Localstack reports the state of every service in a single JSON
+    response from its health endpoint. The endpoint is polled over
+    one persistent HTTP connection.
+
+    Args:
+        localstack_session (:class:`.RunningSession`): The session to check.
+        timeout (float, optional): Connection and read timeout in seconds.
+            Default: 1
+
+    """
+
+    # Newer Localstack versions moved the endpoint under /_localstack.
+    paths = ("/_localstack/health", "/health")
+
+    # "available" services are loaded on their first request.
+    ready_states = ("running", "available")
+
+    def __init__(self, localstack_session, timeout=1):
+        self.localstack_session = localstack_session
+        self.timeout = timeout
+        self._paths = list(self.paths)
+        self._connection = None
+
+    def __call__(self):
+        """Return the names of the services that are ready.
+
+        Names are the keys of :data:`pytest_localstack.services.SERVICES`.
+
+        Raises:
+            pytest_localstack.exceptions.HealthEndpointNotFoundError: If
+                Localstack doesn't have a health endpoint.
+            pytest_localstack.exceptions.ServiceError: If the health
+                endpoint can't be reached.
+
+        """
+        while self._paths:
+            try:
+                status, body = self._get(self._paths[0])
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                raise exceptions.ServiceError("Localstack health check failed") from e
+            if status == 404:
+                self._paths.pop(0)
+                continue
+            if status != 200:
+                raise exceptions.ServiceError(
+                    "Localstack health check returned HTTP %i" % status
+                )
+            try:
+                states = json.loads(body.decode("utf-8"))["services"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise exceptions.ServiceError(
+                    "Localstack health check returned an invalid response"
+                ) from e
+            return self._ready_services(states)
+        raise exceptions.HealthEndpointNotFoundError(self.localstack_session.hostname)
+
+    def close(self):
+        """Close the HTTP connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get(self, path):
+        if self._connection is None:
+            self._connection = edge_connection(self.localstack_session, self.timeout)
+        self._connection.request("GET", path)
+        response = self._connection.getresponse()
+        return response.status, response.read()
+
+    def _ready_services(self, states):
+        ready = set()
+        for service_name in self.localstack_session.services:
+            for name, state in states.items():
+                # Some services are reported under more specific names,
+                # e.g. "cognito" is "cognito-identity" and "cognito-idp".
+                if (
+                    name == service_name or name.startswith(service_name + "-")
+                ) and state in self.ready_states:
+                    ready.add(service_name)
+                    break
+        return ready
+
+
 def port_check(service_name):
     """Check that a service port is open."""
 
@@ -41,12 +161,65 @@ def port_check(service_name):
     return _check
 
 
+class ProbeClientCache(utils.LRUCache):
+    """Cache of the botocore clients used by :func:`botocore_check`.
+
+    Creating a client loads the service model and builds a client class,
+    which takes much longer than the probe itself. Clients are cached per
+    service and reused each time the service is checked again.
+
+    The cache also times client creation so that the time it saved
+    can be reported.
+    """
+
+    def __init__(self):
+        super(ProbeClientCache, self).__init__()
+        self.create_time = 0.0
+
+    def get(self, service_name, create_client):
+        """Return the cached client for `service_name`.
+
+        `create_client` is called without arguments to create the
+        client if it isn't cached yet.
+        """
+
+        def _timed_create_client():
+            start_time = time.time()
+            client = create_client()
+            with self._lock:
+                self.create_time += time.time() - start_time
+            return client
+
+        return super(ProbeClientCache, self).get(service_name, _timed_create_client)
+
+    @property
+    def saved_time(self):
+        """Return the estimated seconds saved by reusing cached clients."""
+        if not self.misses:
+            return 0.0
+        return self.hits * self.create_time / self.misses
+
+
+def _probe_client_config():
+    config_kwargs = {
+        "connect_timeout": 1,
+        "read_timeout": 1,
+        "s3": {"addressing_style": "path"},
+    }
+    if constants.BOTOCORE_VERSION >= (1, 6, 0):
+        # Handle retries at a higher level
+        config_kwargs["retries"] = {"max_attempts": 1}
+    return botocore.config.Config(**config_kwargs)
+
+
 def botocore_check(service_name, client_func_name):
     """Decorator to check service via botocore Client.
 
     `client_func_name` should be the name of a harmless client
     method to call that has no required arguements.
     `list_*` methods are usually good candidates.
+
+    Clients are reused from the session's :class:`ProbeClientCache`.
     """
 
     def _decorator(check_results_func):
@@ -55,17 +228,11 @@ def botocore_check(service_name, client_func_name):
             url = localstack_session.endpoint_url(service_name)
             if not is_port_open(url):
                 raise exceptions.ServiceError(service_name=service_name)
-            config_kwargs = {
-                "connect_timeout": 1,
-                "read_timeout": 1,
-                "s3": {"addressing_style": "path"},
-            }
-            if constants.BOTOCORE_VERSION >= (1, 6, 0):
-                config_kwargs["retries"] = {"max_attempts": 1}
-            client = localstack_session.botocore.client(
+            client = localstack_session.probe_clients.get(
                 service_name,
-                # Handle retries at a higher level
-                config=botocore.config.Config(**config_kwargs),
+                lambda: localstack_session.botocore.client(
+                    service_name, config=_probe_client_config()
+                ),
             )
             client_func = getattr(client, client_func_name)
             try:
@@ -2,10 +2,12 @@ from pytest_localstack.service_checks import port_check, botocore_check_response
 
 
 class Service:
-    def __init__(self, name, check, pro=False):
+    def __init__(self, name, check, pro=False, botocore_name=None):
         self.pro = pro
         self.name = name
         self.check = check
+        # The name of the service's botocore client, if it isn't `name`.
+        self.botocore_name = botocore_name or name
 
 
 SERVICES = { s.name: s for s in [
@@ -18,7 +20,7 @@ SERVICES = { s.name: s for s in [
     Service("cloudtrail", botocore_check_response_type("cloudtrail", "list_trails", list, "Trails"), True),
     Service("cloudwatch", botocore_check_response_type("cloudwatch", "list_dashboards", list, "DashboardEntries")),
     Service("codecommit", botocore_check_response_type("codecommit", "list_repositories", list, "repositories"), True),
-    Service("cognito", botocore_check_response_type("cognito-identity", "list_identity_pools", list, "IdentityPools"), True),
+    Service("cognito", botocore_check_response_type("cognito-identity", "list_identity_pools", list, "IdentityPools"), True, "cognito-identity"),
     Service("dynamodb", botocore_check_response_type("dynamodb", "list_tables", list, "TableNames")),
     Service("dynamodbstreams", botocore_check_response_type("dynamodbstreams", "list_streams", list, "Streams")),
     Service("ecr", botocore_check_response_type("ecr", "describe_repositories", list, "repositories"), True),
@@ -55,7 +57,7 @@ SERVICES = { s.name: s for s in [
     Service("sqs", botocore_check_response_type("sqs", "list_queues", dict)),
     Service("ssm", botocore_check_response_type("ssm", "describe_parameters", list, "Parameters")),
     Service("stepfunctions", botocore_check_response_type("stepfunctions", "list_activities", list, "activities")),
-    Service("timestream", botocore_check_response_type("timestream-query", "describe_endpoints", list, "Endpoints")),
+    Service("timestream", botocore_check_response_type("timestream-query", "describe_endpoints", list, "Endpoints"), botocore_name="timestream-query"),
     Service("transfer", botocore_check_response_type("transfer", "list_servers", list, "Servers")),
     Service("xray", port_check("xray")),
 ]}
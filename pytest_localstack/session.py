@@ -1,16 +1,21 @@
 """Run and interact with a Localstack container."""
+import concurrent.futures
+import contextlib
 import logging
 import os
 import string
+import threading
 import time
 from copy import copy
 
 from packaging import version
 
 from pytest_localstack import (
+    cleaners,
     constants,
     container,
     exceptions,
+    orphans,
     plugin,
     service_checks,
     utils,
@@ -21,8 +26,39 @@ from pytest_localstack.services import SERVICES
 logger = logging.getLogger(__name__)
 
 
+class Timeline:
+    """How long each phase of starting a session took.
+
+    Phases are:
+
+    - ``pull``: Pulling the Localstack image.
+    - ``run``: Creating and starting the container.
+    - ``ready_log``: Waiting for Localstack to log that it's ready.
+    - ``first_response``: From the start of service checks until
+      Localstack first responded.
+    - ``services``: Waiting for all services to be available.
+
+    Attributes:
+        phases (list): ``(phase, seconds)`` tuples in the order the
+            phases finished. Phases can overlap.
+        services (dict): Seconds each service took to become available,
+            counted from the start of the service checks.
+        total (float): Seconds the whole start took, or None if the
+            session hasn't finished starting.
+
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.services = {}
+        self.total = None
+
+
 class RunningSession:
-    """Connects to an already running localstack server"""
+    """Connects to an already running localstack server
+
+    See :class:`LocalstackSession` for the arguments.
+    """
 
     def __init__(
         self,
@@ -31,12 +67,30 @@ class RunningSession:
         region_name=None,
         use_ssl=False,
         localstack_version="latest",
+        edge_port=constants.EDGE_PORT,
+        deep_service_checks=False,
+        warm_up=False,
+        client_cache_size=None,
+        botocore_patch_mode="proxy",
+        botocore_host_check="strict",
         **kwargs
     ):
 
+        plugin.load_default_plugins()
         self.kwargs = kwargs
+        self.client_cache_size = client_cache_size
+        self.botocore_patch_mode = botocore_patch_mode
+        self.botocore_host_check = botocore_host_check
         self.use_ssl = use_ssl
         self.region_name = region_name
+        self.edge_port = edge_port
+        self.deep_service_checks = deep_service_checks
+        self.warm_up = warm_up
+        self.warm_up_cancelled = threading.Event()
+        self._warm_up_thread = None
+        self.ready_services = {}
+        self.timeline = Timeline()
+        self.probe_clients = service_checks.ProbeClientCache()
         self._hostname = hostname
         self.localstack_version = localstack_version
 
@@ -76,15 +130,84 @@ class RunningSession:
 
     def start(self, timeout=60):
         """Starts Localstack if needed."""
+        self.timeline = Timeline()
+        start_time = time.time()
         plugin.manager.hook.session_starting(session=self)
 
-        self._check_services(timeout)
+        with self._timed("services"):
+            self._check_services(timeout)
+        self.timeline.total = time.time() - start_time
         plugin.manager.hook.session_started(session=self)
+        if self.warm_up:
+            self._start_warm_up()
+
+    @contextlib.contextmanager
+    def _timed(self, phase):
+        """Context manager that records a phase in :attr:`timeline`."""
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self._record_phase(phase, time.time() - start_time)
+
+    def _start_warm_up(self):
+        """Run the session_warm_up hooks on a background thread."""
+        cancelled = self.warm_up_cancelled = threading.Event()
+
+        def _warm_up():
+            try:
+                with self._timed("warm_up"):
+                    plugin.manager.hook.session_warm_up(session=self)
+            except exceptions.ContainerNotStartedError:
+                logger.debug("%r stopped while warming up", self)
+            except Exception:
+                if not cancelled.is_set():
+                    logger.exception("Failed to warm up %r", self)
+
+        self._warm_up_thread = threading.Thread(
+            target=_warm_up, name="localstack-warm-up", daemon=True
+        )
+        self._warm_up_thread.start()
+
+    def _stop_warm_up(self, timeout=10):
+        """Cancel the warm-up and wait for its thread to finish."""
+        self.warm_up_cancelled.set()
+        thread, self._warm_up_thread = self._warm_up_thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _record_phase(self, phase, duration):
+        self.timeline.phases.append((phase, duration))
+        logger.debug("%r %s took %.2fs", self, phase, duration)
+        plugin.manager.hook.session_phase_timed(
+            session=self, phase=phase, duration=duration
+        )
 
-    def _check_services(self, timeout, initial_retry_delay=0.01, max_delay=1):
+    def _check_services(
+        self,
+        timeout,
+        initial_retry_delay=0.01,
+        max_delay=1,
+        max_workers=16,
+        ready_event=None,
+        ready_event_fallback_delay=5,
+    ):
         """Check that all Localstack services are running and accessible.
 
-        Does exponential backoff up to `max_delay`.
+        Localstack's health endpoint is polled to find out which services
+        are available. If :attr:`deep_service_checks` is set, or
+        Localstack has no health endpoint, each service is also checked
+        by making an API call to it. These checks run concurrently on a
+        pool of up to `max_workers` threads.
+
+        Services that aren't available yet are checked again, with
+        exponential backoff up to `max_delay`. The time each service
+        became available is recorded in :attr:`ready_services`.
+
+        If `ready_event` is given, checks only start once it is set
+        (e.g. when Localstack logs that it is ready). Until then services
+        are only checked every `ready_event_fallback_delay` seconds,
+        in case the event is never set.
 
         Args:
             timeout (float): Number of seconds to wait for services to
@@ -94,6 +217,13 @@ class RunningSession:
                 Default: 0.01
             max_delay (float, optional): Max time in seconds to wait between
                 checking service availability. Default: 1
+            max_workers (int, optional): Max number of services to check
+                at the same time. Default: 16
+            ready_event (:class:`threading.Event`, optional): Event to wait
+                for before checking services.
+            ready_event_fallback_delay (float, optional): Time in seconds
+                to wait between checks while `ready_event` isn't set.
+                Default: 5
 
         Returns:
             None
@@ -103,31 +233,129 @@ class RunningSession:
                 started before `timeout` was reached.
 
         """
-        services = set(self.services)
+        self.ready_services = self.timeline.services = {}
+        pending = set(self.services)
+        if not pending:
+            return
+        responded = False
+        errors = {}
         num_retries = 0
         start_time = time.time()
-        while services and (time.time() - start_time) < timeout:
-            for service_name in list(
-                services
-            ):  # list() because set may change during iteration
-                try:
-                    SERVICES[service_name].check(self)
-                    services.discard(service_name)
-                except exceptions.ServiceError as e:
-                    if (time.time() - start_time) >= timeout:
-                        raise exceptions.TimeoutError(
-                            "Localstack service not started: {0}".format(service_name)
-                        ) from e
-            if services:
-                delay = (2 ** num_retries) * initial_retry_delay
-                if delay > max_delay:
-                    delay = max_delay
-                    time.sleep(delay)
-                    num_retries += 1
+        health_check = service_checks.HealthCheck(self)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_workers, len(pending))
+        )
+        if ready_event is not None:
+            with self._timed("ready_log"):
+                ready_event.wait(min(ready_event_fallback_delay, timeout))
+        try:
+            while True:
+                to_check = pending
+                if health_check is not None:
+                    try:
+                        healthy = health_check() & pending
+                    except exceptions.HealthEndpointNotFoundError:
+                        logger.debug("Falling back to per-service checks")
+                        health_check = None
+                    except exceptions.ServiceError as e:
+                        errors.update((service_name, e) for service_name in pending)
+                        to_check = ()
+                    else:
+                        if not responded:
+                            responded = True
+                            self._record_phase(
+                                "first_response", time.time() - start_time
+                            )
+                        to_check = healthy if self.deep_service_checks else ()
+                        for service_name in healthy - set(to_check):
+                            self._service_ready(service_name, pending, start_time)
+                futures = {
+                    executor.submit(SERVICES[service_name].check, self): service_name
+                    for service_name in to_check
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    service_name = futures[future]
+                    try:
+                        future.result()
+                    except exceptions.ServiceError as e:
+                        errors[service_name] = e
+                        continue
+                    if not responded:
+                        responded = True
+                        self._record_phase("first_response", time.time() - start_time)
+                    self._service_ready(service_name, pending, start_time)
+                if not pending:
+                    return
+                if (time.time() - start_time) >= timeout:
+                    raise exceptions.TimeoutError(
+                        "Localstack services not started: {0}".format(
+                            ", ".join(sorted(pending))
+                        )
+                    ) from errors.get(min(pending))
+                logger.debug(
+                    "Waiting for Localstack services: %s", ", ".join(sorted(pending))
+                )
+                if ready_event is not None and not ready_event.is_set():
+                    time_remaining = timeout - (time.time() - start_time)
+                    ready_event.wait(min(ready_event_fallback_delay, time_remaining))
+                    continue
+                delay = min((2 ** num_retries) * initial_retry_delay, max_delay)
+                time.sleep(delay)
+                num_retries += 1
+        finally:
+            executor.shutdown(wait=False)
+            if health_check is not None:
+                health_check.close()
+            if self.probe_clients.misses:
+                logger.debug(
+                    "Created %i probe clients in %.2fs, reused them %i times, "
+                    "saving about %.2fs",
+                    self.probe_clients.misses,
+                    self.probe_clients.create_time,
+                    self.probe_clients.hits,
+                    self.probe_clients.saved_time,
+                )
+
+    def _service_ready(self, service_name, pending, start_time):
+        pending.discard(service_name)
+        self.ready_services[service_name] = time.time() - start_time
+        logger.debug(
+            "Localstack service %s ready after %.2fs",
+            service_name,
+            self.ready_services[service_name],
+        )
+        plugin.manager.hook.session_service_ready(
+            session=self,
+            service_name=service_name,
+            elapsed=self.ready_services[service_name],
+        )
+
+    @property
+    def pending_services(self):
+        """Return the services that aren't known to be available yet."""
+        return set(self.services) - set(self.ready_services)
+
+    def reset(self, timeout=10):
+        """Wipe the state of all services without restarting Localstack.
+
+        Uses Localstack's reset endpoint if it has one, otherwise
+        deletes the resources of each service.
+        See :func:`pytest_localstack.cleaners.reset`.
+
+        Args:
+            timeout (float, optional): Timeout in seconds for the
+                reset endpoint. Default: 10
+
+        """
+        start_time = time.time()
+        method = cleaners.reset(self, timeout=timeout)
+        logger.debug("Reset %r by %s in %.2fs", self, method, time.time() - start_time)
 
     def stop(self, timeout=10):
         """Stops Localstack."""
+        self._stop_warm_up(timeout)
         plugin.manager.hook.session_stopping(session=self)
+        self.probe_clients.clear()
         plugin.manager.hook.session_stopped(session=self)
 
     def __enter__(
@@ -147,11 +375,13 @@ class RunningSession:
 
     def map_port(self, port):
         """Return host port based on Localstack port."""
+        if int(port) == constants.EDGE_PORT:
+            return self.edge_port
         return port
 
     def service_hostname(self, service_name):
         """Get hostname and port for an AWS service."""
-        port = self.map_port(4566)
+        port = self.map_port(constants.EDGE_PORT)
 
         return "%s:%i" % (self.hostname, port)
 
@@ -200,14 +430,75 @@ class LocalstackSession(RunningSession):
             DynamoDB API responses.
         container_log_level (int, optional): The logging level to use
             for Localstack container logs. Defaults to :attr:`logging.DEBUG`.
+        container_log_max_lines (int, optional): If set, keep the last
+            this many lines of the container logs in :attr:`container_logs`
+            instead of logging them. The pytest plugin adds them to the
+            reports of failed tests.
+        container_log_max_bytes (int, optional): Like
+            `container_log_max_lines`, but limits the total size of
+            the kept lines in (UTF-8 encoded) bytes.
+        container_log_dir (str, optional): If set, copy the raw container
+            logs to a file named after the container in this directory
+            instead of logging them. The file's path is
+            :attr:`container_log_path` once the session has started.
+        container_log_rotate_bytes (int, optional): Rotate the log file
+            once it reaches this many bytes. Default is to never rotate.
+        container_log_backups (int, optional): The number of rotated log
+            files to keep. Default: 5
+        container_log_compress (bool, optional): Gzip the log files.
+            Default is False.
+        container_ttl (float, optional): Seconds after which the container
+            may be removed as an orphan even if this process is still
+            running, see :mod:`pytest_localstack.orphans`. None for never.
+            Default is 6 hours.
+        owner_pid (int, optional): The process responsible for stopping
+            the container. If it exits, the container may be removed as
+            an orphan. Defaults to this process.
+        container_labels (dict, optional): Extra labels for the container.
         localstack_version (str, optional): The version of the Localstack
             image to use. Defaults to `latest`.
         auto_remove (bool, optional): If True, delete the Localstack
             container when it stops.
+        pull_image (bool|str, optional): When to pull the Localstack
+            image before running it. One of
+
+            - ``"always"`` (or True): Always pull the image.
+            - ``"if-missing"``: Only pull the image if it isn't present
+              locally.
+            - ``"never"`` (or False): Never pull the image.
+            - ``"if-older-than=<duration>"``: Pull the image if it's missing
+              or was last pulled longer ago than `duration`
+              (e.g. ``"if-older-than=12h"``).
+
+            Default is True.
+        image_pull_times (dict, optional): Mapping of image names to the
+            time they were last pulled, used by the ``if-older-than``
+            policy. Updated whenever an image is pulled.
         container_name (str, optional): The name for the Localstack
             container. Defaults to a randomly generated id.
         use_ssl (bool, optional): If True use SSL to connect to Localstack.
             Default is False.
+        deep_service_checks (bool, optional): If True, check each service
+            is working by calling its API, instead of only trusting
+            Localstack's health endpoint. Default is False.
+        warm_up (bool, optional): If True, load the service models and
+            create clients for every service on a background thread once
+            the session has started, recorded as the ``warm_up`` phase
+            of :attr:`timeline`. The clients are only kept if
+            `client_cache_size` is set; otherwise only the service models
+            stay loaded. Stopping the session cancels the warm-up.
+            Default is False.
+        client_cache_size (int, optional): If set, the botocore and boto3
+            factories return the same client for the same arguments,
+            keeping this many of the most recently used clients.
+            Default is to create a new client each time.
+        botocore_patch_mode (str, optional): How
+            :meth:`~.BotocoreTestResourceFactory.patch_botocore` redirects
+            clients that already exist, ``"proxy"`` or ``"events"``.
+            Default is ``"proxy"``.
+        botocore_host_check (str, optional): How patched clients check
+            that requests only go to Localstack, ``"strict"``,
+            ``"sampled"`` or ``"off"``. Default is ``"strict"``.
         **kwargs: Additional kwargs will be stored in a `kwargs` attribute
             in case test resource factories want to access them.
 
@@ -216,6 +507,9 @@ class LocalstackSession(RunningSession):
     image_name = "localstack/localstack"
     factories = []
 
+    # Localstack logs this line once all services are started.
+    ready_log_pattern = r"^Ready\.$"
+
     def __init__(
         self,
         docker_client,
@@ -224,15 +518,27 @@ class LocalstackSession(RunningSession):
         kinesis_error_probability=0.0,
         dynamodb_error_probability=0.0,
         container_log_level=logging.DEBUG,
+        container_log_max_lines=None,
+        container_log_max_bytes=None,
+        container_log_dir=None,
+        container_log_rotate_bytes=None,
+        container_log_backups=5,
+        container_log_compress=False,
+        container_ttl=constants.DEFAULT_CONTAINER_TTL,
+        owner_pid=None,
+        container_labels=None,
         localstack_version="latest",
         auto_remove=True,
         pull_image=True,
+        image_pull_times=None,
         container_name=None,
         use_ssl=False,
         localstack_api_key=None,
         **kwargs
     ):
         self._container = None
+        self._log_reader = None
+        self._ports = {}
         self._factory_cache = {}
 
         self.docker_client = docker_client
@@ -240,7 +546,9 @@ class LocalstackSession(RunningSession):
         self.kinesis_error_probability = kinesis_error_probability
         self.dynamodb_error_probability = dynamodb_error_probability
         self.auto_remove = bool(auto_remove)
-        self.pull_image = bool(pull_image)
+        self.pull_policy, self.pull_max_age = parse_pull_policy(pull_image)
+        self.pull_image = self.pull_policy != "never"
+        self.image_pull_times = {} if image_pull_times is None else image_pull_times
 
         super(LocalstackSession, self).__init__(
             hostname=constants.LOCALHOST,
@@ -252,6 +560,19 @@ class LocalstackSession(RunningSession):
         )
 
         self.container_log_level = container_log_level
+        self.container_logs = None
+        if container_log_max_lines is not None or container_log_max_bytes is not None:
+            self.container_logs = container.LogRingBuffer(
+                max_lines=container_log_max_lines, max_bytes=container_log_max_bytes
+            )
+        self.container_log_dir = container_log_dir
+        self.container_log_rotate_bytes = container_log_rotate_bytes
+        self.container_log_backups = container_log_backups
+        self.container_log_compress = container_log_compress
+        self.container_log_path = None
+        self.container_ttl = container_ttl
+        self.owner_pid = owner_pid
+        self.container_labels = dict(container_labels or {})
         self.localstack_version = localstack_version
         self.container_name = container_name or generate_container_name()
         self.localstack_api_key = localstack_api_key
@@ -273,14 +594,19 @@ class LocalstackSession(RunningSession):
         if self._container is not None:
             raise exceptions.ContainerAlreadyStartedError(self)
 
+        self.timeline = Timeline()
+        total_start_time = time.time()
+
         logger.debug("Starting Localstack container %s", self.container_name)
         logger.debug("%r running starting hooks", self)
         plugin.manager.hook.session_starting(session=self)
 
         image_name = self.image_name + ":" + self.localstack_version
-        if self.pull_image:
+        if self._should_pull(image_name):
             logger.debug("Pulling docker image %r", image_name)
-            self.docker_client.images.pull(image_name)
+            with self._timed("pull"):
+                self.docker_client.images.pull(image_name)
+            self.image_pull_times[image_name] = time.time()
 
         start_time = time.time()
 
@@ -305,14 +631,24 @@ class LocalstackSession(RunningSession):
 
 
         logger.info("Starting localstack container")
-        self._container = self.docker_client.containers.run(
-            image_name,
-            name=self.container_name,
-            detach=True,
-            auto_remove=self.auto_remove,
-            environment=environment,
-            ports={4566: None},
-        )
+        with self._timed("run"):
+            self._container = self.docker_client.containers.run(
+                image_name,
+                name=self.container_name,
+                detach=True,
+                auto_remove=self.auto_remove,
+                environment=environment,
+                ports={constants.EDGE_PORT: None},
+                labels=dict(
+                    orphans.container_labels(
+                        owner_pid=self.owner_pid, ttl=self.container_ttl
+                    ),
+                    **self.container_labels
+                ),
+            )
+            # Host ports are only assigned once the container starts.
+            self._container.reload()
+            self._ports = _published_ports(self._container.attrs)
         logger.debug(
             "Started Localstack container %s (id: %s)",
             self.container_name,
@@ -321,44 +657,70 @@ class LocalstackSession(RunningSession):
 
         # Tail container logs
         container_logger = logger.getChild("containers.%s" % self._container.short_id)
-        self._stdout_tailer = container.DockerLogTailer(
-            self._container,
-            container_logger.getChild("stdout"),
-            self.container_log_level,
-            stdout=True,
-            stderr=False,
-        )
-        self._stdout_tailer.start()
-        self._stderr_tailer = container.DockerLogTailer(
+        sink = None
+        if self.container_log_dir is not None:
+            os.makedirs(self.container_log_dir, exist_ok=True)
+            sink = container.LogFileSink(
+                os.path.join(self.container_log_dir, self.container_name + ".log"),
+                max_bytes=self.container_log_rotate_bytes,
+                backup_count=self.container_log_backups,
+                compress=self.container_log_compress,
+            )
+            self.container_log_path = sink.path
+        self._log_reader = container.DockerLogReader(
             self._container,
-            container_logger.getChild("stderr"),
+            (
+                None
+                if self.container_logs is not None or sink is not None
+                else container_logger
+            ),
             self.container_log_level,
-            stdout=False,
-            stderr=True,
+            buffer=self.container_logs,
+            sink=sink,
         )
-        self._stderr_tailer.start()
+        ready_event = self._log_reader.watch(self.ready_log_pattern)
+        self._log_reader.start()
 
         try:
             timeout_remaining = timeout - (time.time() - start_time)
             if timeout_remaining <= 0:
                 raise exceptions.TimeoutError("Container took too long to start.")
 
-            self._check_services(timeout_remaining)
+            with self._timed("services"):
+                self._check_services(timeout_remaining, ready_event=ready_event)
+            self._log_reader.unwatch(ready_event)
+            self.timeline.total = time.time() - total_start_time
 
             logger.debug("%r running started hooks", self)
             plugin.manager.hook.session_started(session=self)
             logger.debug("%r finished started hooks", self)
+            if self.warm_up:
+                self._start_warm_up()
         except exceptions.TimeoutError:
             if self._container is not None:
                 self.stop(0.1)
             raise
 
-    def stop(self, timeout=10):
+    def _should_pull(self, image_name):
+        """Return True if `image_name` should be pulled before running it."""
+        if self.pull_policy in ("always", "never"):
+            return self.pull_policy == "always"
+        if not self.docker_client.images.list(name=image_name):
+            return True
+        if self.pull_policy == "if-missing":
+            return False
+        last_pulled = self.image_pull_times.get(image_name)
+        return last_pulled is None or time.time() - last_pulled > self.pull_max_age
+
+    def stop(self, timeout=10, reaper=None):
         """Stop the Localstack container.
 
         Args:
             timeout (float, optional): Timeout in seconds to wait for the
                 container to stop before sending a SIGKILL. Default: 10
+            reaper (:class:`.ContainerReaper`, optional): Detach the
+                container and let this reaper stop it in the background
+                instead of waiting for it to stop.
 
         Raises:
             docker.errors.APIError: If the Docker daemon returns an error.
@@ -366,30 +728,103 @@ class LocalstackSession(RunningSession):
         """
         if self._container is not None:
             logger.debug("Stopping %r", self)
+            self._stop_warm_up(timeout)
             logger.debug("Running stopping hooks for %r", self)
             plugin.manager.hook.session_stopping(session=self)
             logger.debug("Finished stopping hooks for %r", self)
-            self._container.stop(timeout=10)
-            self._container = None
-            self._stdout_tailer = None
-            self._stderr_tailer = None
+            if reaper is not None:
+                reaper.stop(self.detach(), timeout=timeout)
+            else:
+                self._container.stop(timeout=timeout)
+                self._container = None
+                self._ports = {}
+                self._stop_log_reader()
+                self.probe_clients.clear()
             logger.debug("Stopped %r", self)
             logger.debug("Running stopped hooks for %r", self)
             plugin.manager.hook.session_stopped(session=self)
             logger.debug("Finished stopped hooks for %r", self)
 
+    def detach(self):
+        """Stop managing the Localstack container without stopping it.
+
+        The container keeps running, but this session will no longer
+        stop it, either in :meth:`stop` or on garbage collection.
+
+        Returns:
+            The detached :class:`docker.models.containers.Container`,
+            or None if the session wasn't started.
+
+        """
+        self._stop_warm_up()
+        detached = self._container
+        if detached is not None:
+            logger.debug("Detaching %r from container %s", self, detached.short_id)
+        self._container = None
+        self._ports = {}
+        self._stop_log_reader()
+        self.probe_clients.clear()
+        return detached
+
+    def _stop_log_reader(self):
+        if self._log_reader is not None:
+            self._log_reader.stop(timeout=1)
+            self._log_reader = None
+
     def __del__(self):
         """Stop container on garbage collection."""
         self.stop(0.1)
 
     def map_port(self, port):
-        """Return host port based on Localstack container port."""
+        """Return host port based on Localstack container port.
+
+        Ports are looked up once per container and cached until
+        the container is stopped.
+        """
         if self._container is None:
             raise exceptions.ContainerNotStartedError(self)
-        result = self.docker_client.api.port(self._container.id, int(port))
-        if not result:
-            return None
-        return int(result[0]["HostPort"])
+        port = int(port)
+        if port not in self._ports:
+            result = self.docker_client.api.port(self._container.id, port)
+            self._ports[port] = int(result[0]["HostPort"]) if result else None
+        return self._ports[port]
+
+
+def _published_ports(container_attrs):
+    """Return a dict of container TCP ports to host ports.
+
+    Args:
+        container_attrs (dict): The container's inspect data.
+
+    """
+    ports = {}
+    network_settings = container_attrs.get("NetworkSettings") or {}
+    for container_port, bindings in (network_settings.get("Ports") or {}).items():
+        port, _, protocol = container_port.partition("/")
+        if bindings and protocol in ("", "tcp"):
+            ports[int(port)] = int(bindings[0]["HostPort"])
+    return ports
+
+
+def parse_pull_policy(pull_image):
+    """Parse a `pull_image` argument of :class:`LocalstackSession`.
+
+    Returns:
+        A ``(policy, max_age)`` tuple. `max_age` is a number of seconds
+        for the ``if-older-than`` policy, otherwise None.
+
+    Raises:
+        ValueError: If `pull_image` isn't a valid pull policy.
+
+    """
+    if isinstance(pull_image, bool):
+        return ("always" if pull_image else "never"), None
+    policy, _, max_age = str(pull_image).partition("=")
+    if policy == "if-older-than":
+        return policy, utils.parse_duration(max_age)
+    if policy in ("always", "if-missing", "never") and not max_age:
+        return policy, None
+    raise ValueError("unsupported image pull policy: %r" % (pull_image,))
 
 
 def generate_container_name():
@@ -0,0 +1,199 @@
+"""Share Localstack containers between pytest-xdist workers.
+
+The first worker to ask for a container configuration starts it and
+publishes the container id and edge port in a state file. The other
+workers attach to the running container as a :class:`.RunningSession`.
+Every worker holds one reference to the container until it finishes;
+the last worker to let go stops the container.
+
+Access to the state file is serialized with an exclusive
+:func:`fcntl.flock` on a sibling lock file, so this is POSIX-only.
+"""
+import contextlib
+import fcntl
+import json
+import logging
+import os
+
+from pytest_localstack import constants
+
+logger = logging.getLogger(__name__)
+
+
+class SharedContainer:
+    """A Localstack container shared by several processes.
+
+    Args:
+        directory (str): A directory every process can see.
+        key (str): The container configuration key
+            (see :func:`pytest_localstack.pool.config_key`).
+
+    """
+
+    def __init__(self, directory, key):
+        self.key = key
+        self.path = os.path.join(directory, "localstack-%s.json" % key)
+        self.lock_path = self.path + ".lock"
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Context manager that holds the exclusive lock on the state file."""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_state(self):
+        """Return the published container state, or None.
+
+        Must be called while holding :meth:`locked`.
+        """
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_state(self, state):
+        """Publish the container state.
+
+        Must be called while holding :meth:`locked`.
+        """
+        with open(self.path, "w") as f:
+            json.dump(state, f)
+
+    def acquire(self, start_session, attach_session, docker_client=None):
+        """Take a reference to the shared container.
+
+        A published container that is no longer running, for example
+        because the process that started it was killed, is forgotten
+        and a new one is started.
+
+        Args:
+            start_session (callable): Called without arguments to start
+                a new :class:`.LocalstackSession` if no process has
+                published a container yet.
+            attach_session (callable): Called with the published state
+                dict to create and start a session connected to the
+                container.
+            docker_client (optional): A docker-py Client object used to
+                check that a published container is still running.
+
+        Returns:
+            A started session.
+
+        """
+        with self.locked():
+            state = self.read_state()
+            if (
+                state is not None
+                and docker_client is not None
+                and not _is_running(docker_client, state["container_id"])
+            ):
+                logger.warning(
+                    "Shared container %s isn't running, starting a new one",
+                    state["container_id"],
+                )
+                state = None
+            if state is None:
+                session = start_session()
+                state = {
+                    "container_id": session._container.id,
+                    "hostname": session.hostname,
+                    "edge_port": session.map_port(constants.EDGE_PORT),
+                    "references": 0,
+                }
+                logger.debug("Publishing %r as shared container %s", session, self.key)
+            else:
+                session = attach_session(state)
+                logger.debug(
+                    "Attached %r to shared container %s", session, state["container_id"]
+                )
+            state["references"] += 1
+            self.write_state(state)
+        return session
+
+    def release(self, session, docker_client, timeout=10, reaper=None):
+        """Drop a reference taken with :meth:`acquire`.
+
+        If this was the last reference, the container is stopped.
+        Otherwise, a session that started the container detaches
+        from it so it keeps running for the other processes.
+
+        Args:
+            session: The session returned by :meth:`acquire`.
+            docker_client: A docker-py Client object used to stop a
+                container this process didn't start.
+            timeout (float, optional): Timeout in seconds to wait for the
+                container to stop. Default: 10
+            reaper (:class:`.ContainerReaper`, optional): Stop the
+                container with this reaper instead of waiting for it.
+
+        """
+        with self.locked():
+            state = self.read_state()
+            state["references"] -= 1
+            if state["references"] > 0:
+                self.write_state(state)
+                if hasattr(session, "detach"):
+                    session.detach()
+                session.stop(timeout=timeout)
+                return
+            os.remove(self.path)
+            if hasattr(session, "detach"):
+                session.stop(timeout=timeout, reaper=reaper)
+                return
+            session.stop(timeout=timeout)
+            logger.debug("Stopping shared container %s", state["container_id"])
+            container = docker_client.containers.get(state["container_id"])
+            if reaper is not None:
+                reaper.stop(container, timeout=timeout)
+            else:
+                container.stop(timeout=timeout)
+
+
+def _is_running(docker_client, container_id):
+    import docker
+
+    try:
+        return docker_client.containers.get(container_id).status == "running"
+    except docker.errors.NotFound:
+        return False
+
+
+class SharedSessions:
+    """The shared sessions used by this process.
+
+    Each configuration key is acquired at most once per process and
+    held until :meth:`close`.
+
+    Args:
+        directory (str): A directory every process can see.
+
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._sessions = {}
+
+    def get(self, key, docker_client, start_session, attach_session):
+        """Return this process's session for `key`, acquiring it if needed.
+
+        See :meth:`SharedContainer.acquire`.
+        """
+        if key not in self._sessions:
+            shared = SharedContainer(self.directory, key)
+            session = shared.acquire(start_session, attach_session, docker_client)
+            self._sessions[key] = (shared, session, docker_client)
+        return self._sessions[key][1]
+
+    def close(self, timeout=10, reaper=None):
+        """Release every session acquired by this process.
+
+        See :meth:`SharedContainer.release`.
+        """
+        sessions, self._sessions = self._sessions, {}
+        for shared, session, docker_client in sessions.values():
+            shared.release(session, docker_client, timeout=timeout, reaper=reaper)
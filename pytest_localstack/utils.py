@@ -1,13 +1,17 @@
 """Misc utilities."""
+import collections
 import contextlib
 import os
+import re
+import sys
+import threading
 import types
-import urllib.request
-from unittest import mock
 
 
 def check_proxy_env_vars():
     """Raise warnings about improperly-set proxy environment variables."""
+    import urllib.request
+
     proxy_settings = urllib.request.getproxies()
     if "http" not in proxy_settings and "https" not in proxy_settings:
         return
@@ -81,3 +85,81 @@ def get_version_tuple(version):
         version = version[1:]
     parts = version.split(".")
     return tuple(int(p) for p in parts)
+
+
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_duration(duration):
+    """Return the number of seconds in a duration string like '30m' or '12h'.
+
+    Supported units are s, m, h and d. Numbers without a unit are seconds.
+    """
+    match = re.match(r"^\s*(\d+(?:\.\d*)?)\s*([smhd]?)\s*$", str(duration))
+    if not match:
+        raise ValueError("invalid duration: %r" % (duration,))
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+class LRUCache:
+    """A thread-safe mapping that keeps the `maxsize` most recently used items.
+
+    Args:
+        maxsize (int, optional): The maximum number of items to keep.
+            None for no limit. Default: None
+
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._items = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, create):
+        """Return the item for `key`.
+
+        `create` is called without arguments to create the item if it
+        isn't cached. The least recently used item is evicted if the
+        cache is full.
+        """
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                pass
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+        value = create()
+        with self._lock:
+            self.misses += 1
+            value = self._items.setdefault(key, value)
+            self._items.move_to_end(key)
+            while self.maxsize is not None and len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Forget all items."""
+        with self._lock:
+            self._items.clear()
+
+
+def __getattr__(name):
+    # unittest.mock is slow to import and only needed to patch botocore.
+    if name == "mock":
+        from unittest import mock
+
+        return mock
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ needs Python 3.7 (PEP 562).
+    from unittest import mock  # noqa: F401
@@ -65,7 +65,10 @@ def setup_package():
             "Topic :: Software Development :: Testing",
             "Topic :: Utilities",
         ],
-        entry_points={"pytest11": ["localstack = pytest_localstack"]},
+        entry_points={
+            "pytest11": ["localstack = pytest_localstack"],
+            "console_scripts": ["pytest-localstack = pytest_localstack.orphans:main"],
+        },
     )
 
 
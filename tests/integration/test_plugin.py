@@ -1,5 +1,21 @@
+import gzip
+import os
+
+import pytest
+
+from tests import utils as test_utils
+
 import pytest_localstack
-from pytest_localstack import hookspecs, plugin
+from pytest_localstack import (
+    container,
+    hookspecs,
+    plugin,
+    pool,
+    reuse,
+    session,
+    shared,
+)
+from pytest_localstack.utils import mock
 
 
 @hookspecs.pytest_localstack_hookimpl
@@ -12,3 +28,272 @@ def test_register_plugin_module():
     plugin.register_plugin_module("tests.integration.test_plugin")
     assert pytest_localstack._foo == "bar"
     del pytest_localstack._foo
+
+
+def test_load_default_plugins_retry():
+    """Test that default plugins are loaded again if loading failed."""
+    manager = mock.Mock()
+    manager.load_setuptools_entrypoints.side_effect = [ImportError("boom"), None]
+    with mock.patch.object(plugin, "manager", manager), mock.patch.object(
+        plugin, "_default_plugins_loaded", False
+    ):
+        with pytest.raises(ImportError):
+            plugin.load_default_plugins()
+        manager.hook.contribute_to_module.call_historic.assert_not_called()
+        plugin.load_default_plugins()
+        plugin.load_default_plugins()
+        assert manager.load_setuptools_entrypoints.call_count == 2
+        manager.hook.contribute_to_module.call_historic.assert_called_once()
+
+
+def test_session_timeline():
+    """Test that LocalstackSession.start records a timeline."""
+    test_session = test_utils.make_test_LocalstackSession()
+    phases = []
+
+    class TimingPlugin:
+        @hookspecs.pytest_localstack_hookimpl
+        def session_phase_timed(self, session, phase, duration):
+            phases.append(phase)
+
+    timing_plugin = TimingPlugin()
+    plugin.manager.register(timing_plugin)
+    try:
+        with test_session:
+            pass
+    finally:
+        plugin.manager.unregister(timing_plugin)
+    assert phases == ["pull", "run", "services"]
+    assert [phase for phase, _ in test_session.timeline.phases] == phases
+    assert test_session.timeline.total >= sum(
+        duration for _, duration in test_session.timeline.phases
+    )
+
+
+def test_session_container_log_dir(tmp_path):
+    """Test that LocalstackSession can copy container logs to a file."""
+    test_session = test_utils.make_test_LocalstackSession(
+        container_log_dir=str(tmp_path), container_log_compress=True
+    )
+    with test_session:
+        test_session._log_reader.join(1)
+    assert test_session.container_log_path == str(
+        tmp_path / (test_session.container_name + ".log.gz")
+    )
+    with gzip.open(test_session.container_log_path) as f:
+        assert f.read().startswith(b"foobar 0\n")
+
+
+def test_session_stop_timeout():
+    """Test that LocalstackSession.stop passes its timeout to Docker."""
+    test_session = test_utils.make_test_LocalstackSession()
+    test_session.start()
+    docker_container = test_session._container
+    test_session.stop(timeout=3)
+    docker_container.stop.assert_called_once_with(timeout=3)
+
+
+def test_session_stop_reaper():
+    """Test that LocalstackSession.stop can hand its container to a reaper."""
+    test_session = test_utils.make_test_LocalstackSession()
+    test_session.start()
+    docker_container = test_session._container
+    reaper = mock.Mock(spec=container.ContainerReaper)
+    test_session.stop(timeout=3, reaper=reaper)
+    reaper.stop.assert_called_once_with(docker_container, timeout=3)
+    docker_container.stop.assert_not_called()
+    assert test_session._container is None
+
+
+def test_async_teardown():
+    """Test that fixtures hand their sessions to the reaper when torn down."""
+    started = mock.Mock()
+    reaper = mock.Mock(spec=container.ContainerReaper)
+    with mock.patch.object(
+        pytest_localstack, "_start_session", return_value=started
+    ), mock.patch.object(pytest_localstack, "_reaper", reaper):
+        with pytest_localstack._make_session(None, services=["s3"]) as session:
+            assert session is started
+        started.stop.assert_called_once_with(
+            timeout=pytest_localstack._stop_timeout, reaper=reaper
+        )
+        pytest_localstack.pytest_sessionfinish(mock.Mock())
+    reaper.drain.assert_called_once_with()
+
+
+def test_reuse_sessions():
+    """Test that fixtures reset reused sessions before each use."""
+    started = mock.Mock()
+    reused = mock.Mock()
+    docker_client = mock.Mock()
+    with mock.patch.object(
+        pytest_localstack, "_start_session", return_value=started
+    ) as start_session, mock.patch.object(
+        pytest_localstack, "_reused", reused
+    ), mock.patch.object(
+        pytest_localstack, "_worker_id", "gw1"
+    ):
+        with pytest_localstack._make_session(docker_client, services=["s3"]) as session:
+            assert session is reused.acquire.return_value
+            session.reset.assert_called_once_with()
+        session.stop.assert_not_called()
+        reused.release.assert_called_once_with(session)
+
+        key, client, start_reusable_session, _ = reused.acquire.call_args[0]
+        assert key == pool.config_key(services=["s3"]) + "-gw1"
+        assert client is docker_client
+        assert start_reusable_session({"label": "value"}) is started
+        start_session.assert_called_once_with(
+            docker_client,
+            services=["s3"],
+            container_labels={"label": "value"},
+            container_ttl=None,
+        )
+
+
+def test_reuse_sessions_concurrent(tmp_path):
+    """Test that fixtures used at the same time get their own reused containers."""
+    docker_client = test_utils.make_mock_docker_client()
+    docker_client.containers.list.return_value = []
+    with mock.patch.object(
+        pytest_localstack, "_start_session", side_effect=lambda *a, **kw: mock.Mock()
+    ) as start_session, mock.patch.object(
+        pytest_localstack, "_reused", reuse.ReusedSessions()
+    ), mock.patch.object(
+        pytest_localstack, "_worker_id", None
+    ), mock.patch.object(
+        reuse, "STATE_DIR", str(tmp_path)
+    ):
+        with pytest_localstack._make_session(docker_client, services=["s3"]) as first:
+            with pytest_localstack._make_session(
+                docker_client, services=["s3"]
+            ) as second:
+                assert second is not first
+            first.reset.assert_called_once_with()
+        with pytest_localstack._make_session(docker_client, services=["s3"]) as third:
+            assert third is first
+        assert start_session.call_count == 2
+        pytest_localstack._reused.close()
+
+
+@pytest.mark.parametrize(
+    "option", ["--localstack-pool", "--localstack-prestart", "--localstack-share"]
+)
+def test_reuse_conflicting_options(option):
+    """Test that --localstack-reuse rejects options it would override."""
+    options = {"--localstack-reuse": True}
+    config = mock.Mock(spec=["getoption"])
+    config.getoption.side_effect = lambda name: options.get(name, name == option)
+    with pytest.raises(pytest.UsageError, match=option):
+        pytest_localstack.pytest_configure(config)
+
+
+@pytest.mark.parametrize("idle_ttl", [0, -1])
+def test_reuse_idle_ttl_not_positive(idle_ttl):
+    """Test that --localstack-reuse-idle-ttl must be positive."""
+    options = {"--localstack-reuse": True, "--localstack-reuse-idle-ttl": idle_ttl}
+    config = mock.Mock(spec=["getoption"])
+    config.getoption.side_effect = lambda name: options.get(name, False)
+    with pytest.raises(pytest.UsageError, match="idle-ttl"):
+        pytest_localstack.pytest_configure(config)
+
+
+def test_terminal_summary():
+    """Test the Localstack startup times terminal summary."""
+    timeline = session.Timeline()
+    timeline.phases = [("pull", 1.0), ("run", 2.0), ("services", 3.0)]
+    timeline.services = {"s3": 2.5, "sqs": 1.5}
+    timeline.total = 6.0
+    terminalreporter = mock.Mock()
+    terminalreporter.config.getoption.return_value = 0  # not verbose
+    with mock.patch.dict(pytest_localstack._timelines, {"localstack": [timeline]}):
+        pytest_localstack.pytest_terminal_summary(terminalreporter)
+    lines = [call[0][0] for call in terminalreporter.write_line.call_args_list]
+    assert lines == [
+        "localstack: 1 started, 6.00s mean, 6.00s max",
+        "    mean phase times: pull 1.00s, run 2.00s, services 3.00s",
+        "    slowest services: s3 2.50s, sqs 1.50s",
+    ]
+
+
+def test_failed_report_container_logs():
+    """Test that buffered container logs are added to failed test reports."""
+    test_session = test_utils.make_test_LocalstackSession(container_log_max_lines=2)
+    with test_session:
+        test_session._log_reader.join(1)
+        item = mock.Mock(funcargs={"localstack": test_session, "other": object()})
+        for failed in [False, True]:
+            report = mock.Mock(failed=failed, when="call", sections=[])
+            hook = pytest_localstack.pytest_runtest_makereport(item, None)
+            next(hook)
+            with pytest.raises(StopIteration):
+                hook.send(mock.Mock(get_result=mock.Mock(return_value=report)))
+    assert report.sections == [
+        (
+            "Captured localstack logs call (localstack)",
+            "\n".join(test_session.container_logs.lines()),
+        )
+    ]
+    assert len(test_session.container_logs) == 2
+
+
+def test_share_directory():
+    """Test that --localstack-share only applies to pytest-xdist workers."""
+    config = mock.Mock()
+    config.getoption.side_effect = lambda name: name == "--localstack-share"
+    del config.workerinput
+    with mock.patch.object(pytest_localstack, "_shared", None):
+        pytest_localstack.pytest_sessionstart(mock.Mock(config=config))
+        assert pytest_localstack._shared is None
+
+        config.workerinput = {"workerid": "gw0", "testrunuid": "abc123"}
+        pytest_localstack.pytest_sessionstart(mock.Mock(config=config))
+        directory = pytest_localstack._shared.directory
+    assert directory.endswith(os.path.join("pytest-localstack", "share-abc123"))
+    assert os.path.isdir(directory)
+
+
+def test_share_same_config(tmp_path):
+    """Test that identically configured fixtures share one container."""
+    docker_client = test_utils.make_mock_docker_client()
+    started = mock.Mock(hostname="127.0.0.1")
+    started._container.id = "abc123"
+    started.map_port.return_value = 4566
+    with mock.patch.object(
+        pytest_localstack, "_start_session", return_value=started
+    ) as start_session, mock.patch.object(
+        pytest_localstack, "_shared", shared.SharedSessions(str(tmp_path))
+    ):
+        with pytest_localstack._make_session(docker_client, services=["s3"]) as first:
+            with pytest_localstack._make_session(
+                docker_client, services=["s3"]
+            ) as second:
+                assert second is first is started
+        assert start_session.call_count == 1
+        pytest_localstack._shared.close()
+
+
+def test_prestart_sessions():
+    """Test that fixtures use sessions prestarted during collection."""
+    started = mock.Mock()
+    declared = {}
+    prestarted = {}
+    with mock.patch.object(
+        pytest_localstack, "_start_session", return_value=started
+    ) as start_session, mock.patch.object(
+        pytest_localstack, "_declared_sessions", declared
+    ), mock.patch.object(
+        pytest_localstack, "_prestarted", prestarted
+    ):
+        pytest_localstack._declare_session(None, services=["s3"])
+        pytest_localstack._declare_session(None, services=["s3"])
+        assert len(declared) == 1
+
+        pytest_localstack._prestart_sessions()
+        assert len(prestarted) == 1
+
+        with pytest_localstack._make_session(None, services=["s3"]) as session:
+            assert session is started
+        assert not prestarted
+        start_session.assert_called_once_with(None, services=["s3"])
+        started.stop.assert_called_once()
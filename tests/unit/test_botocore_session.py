@@ -0,0 +1,254 @@
+"""Unit tests for the Localstack botocore Session."""
+import concurrent.futures
+import threading
+
+import botocore.config
+import botocore.session
+
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack.contrib import botocore as localstack_botocore
+from pytest_localstack.utils import mock
+
+
+@pytest.fixture
+def fake_localstack():
+    """Run a fake Localstack that answers with an empty S3 bucket list.
+
+    Yields a RunningSession for it. The paths of the requests it
+    received are stored in a `requests` attribute.
+    """
+    requests = []
+    body = (
+        b'<ListAllMyBucketsResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+        b"<Buckets></Buckets></ListAllMyBucketsResult>"
+    )
+
+    def _get(path):
+        requests.append(path)
+        return 200, body
+
+    with test_utils.fake_http_server({("GET", None): _get}) as port:
+        localstack = test_utils.make_test_RunningSession(
+            region_name="us-east-1", edge_port=port
+        )
+        localstack.requests = requests
+        yield localstack
+
+
+@pytest.mark.parametrize("mode", ["proxy", "events"])
+def test_patch_botocore_existing_client(fake_localstack, mode):
+    """Test that clients created before patching use Localstack."""
+    client = botocore.session.get_session().create_client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="key",
+        aws_secret_access_key="secret",
+    )
+    with fake_localstack.botocore.patch_botocore(mode=mode):
+        assert client.list_buckets()["Buckets"] == []
+        assert client.list_buckets()["Buckets"] == []
+        if mode == "events":
+            # Attributes aren't proxied.
+            assert "amazonaws.com" in client._endpoint.host
+    assert fake_localstack.requests == ["/", "/"]
+    assert "amazonaws.com" in client._endpoint.host
+    assert localstack_botocore._REDIRECTED not in client.__dict__
+
+
+def test_patch_botocore_nested_events(fake_localstack):
+    """Test that nested events patches don't undo each other."""
+    client = botocore.session.get_session().create_client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="key",
+        aws_secret_access_key="secret",
+    )
+    with fake_localstack.botocore.patch_botocore(mode="events"):
+        with fake_localstack.botocore.patch_botocore(mode="events"):
+            assert client.list_buckets()["Buckets"] == []
+        assert client.list_buckets()["Buckets"] == []
+        assert localstack_botocore._REDIRECTED in client.__dict__
+    assert fake_localstack.requests == ["/", "/"]
+    assert localstack_botocore._REDIRECTED not in client.__dict__
+
+
+def test_patch_botocore_mode_from_session():
+    """Test the botocore_patch_mode session argument."""
+    localstack = test_utils.make_test_RunningSession(botocore_patch_mode="nope")
+    with pytest.raises(ValueError):
+        with localstack.botocore.patch_botocore():
+            pass
+
+
+def test_create_client_sts_regional():
+    """Test that STS clients use Localstack instead of the global endpoint."""
+    localstack = test_utils.make_test_RunningSession(region_name="us-east-1")
+    client = localstack.botocore.session().create_client("sts", "us-east-1")
+    assert client._endpoint.host == "http://127.0.0.1:4566"
+
+
+def test_create_client_config():
+    """Test that clients use path-style S3 addressing with any config."""
+    localstack = test_utils.make_test_RunningSession(region_name="us-east-1")
+    ls_session = localstack.botocore.session()
+    config = botocore.config.Config(connect_timeout=7)
+
+    for client in [
+        ls_session.create_client("s3", "us-east-1"),
+        ls_session.create_client("s3", "us-east-1", config=config),
+        ls_session.create_client(
+            "s3", "us-east-1", None, True, None, None, None, None, None, config
+        ),
+    ]:
+        assert client._is_pytest_localstack
+        assert client.meta.config.s3["addressing_style"] == "path"
+    assert client.meta.config.connect_timeout == 7
+
+
+def test_create_client_threads():
+    """Test creating clients from many threads with a new session."""
+    localstack = test_utils.make_test_RunningSession(region_name="us-east-1")
+    ls_session = localstack.botocore.session()
+    assert isinstance(ls_session, localstack_botocore.Session)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(ls_session.create_client, service_name, "us-east-1")
+            for service_name in ["s3", "sqs", "sts", "dynamodb"] * 4
+        ]
+        for future in futures:
+            assert "127.0.0.1" in future.result()._endpoint.host
+
+
+def test_client_cache():
+    """Test that clients are cached when client_cache_size is set."""
+    localstack = test_utils.make_test_RunningSession(
+        region_name="us-east-1", client_cache_size=2
+    )
+    client = localstack.botocore.client("s3")
+    assert localstack.botocore.client("s3") is client
+    regional_client = localstack.botocore.client("s3", "us-east-1")
+    assert regional_client is not client
+    assert localstack.botocore.client("s3", region_name="us-east-1") is regional_client
+    config = botocore.config.Config(connect_timeout=7)
+    assert localstack.botocore.client(
+        "s3", config=config
+    ) is localstack.botocore.client(
+        "s3", config=botocore.config.Config(connect_timeout=7)
+    )
+
+    boto3_client = localstack.boto3.client("sqs")
+    assert localstack.boto3.client("sqs") is boto3_client
+    assert localstack.boto3.client(service_name="sqs") is boto3_client
+    assert localstack.boto3.resource("sqs") is localstack.boto3.resource("sqs")
+
+    localstack.stop()
+    assert localstack.botocore.client("s3") is not client
+    assert localstack.boto3.client("sqs") is not boto3_client
+
+
+def test_client_cache_disabled():
+    """Test that clients aren't cached by default."""
+    localstack = test_utils.make_test_RunningSession(region_name="us-east-1")
+    assert localstack.botocore.client("s3") is not localstack.botocore.client("s3")
+    assert localstack.boto3.client("s3") is not localstack.boto3.client("s3")
+
+
+def test_warm_up():
+    """Test that warm_up creates clients for every service in the background."""
+    localstack = test_utils.make_test_RunningSession(
+        services=["s3", "cognito"],
+        region_name="us-east-1",
+        client_cache_size=4,
+        warm_up=True,
+    )
+    localstack.start()
+    localstack._warm_up_thread.join(timeout=30)
+    assert "warm_up" in dict(localstack.timeline.phases)
+    cache = localstack.botocore._client_cache
+    assert len(cache) == 2
+    assert cache.misses == 2
+    localstack.botocore.client("cognito-identity")
+    assert cache.hits == 1
+    localstack.stop()
+
+
+def test_warm_up_cancelled():
+    """Test that stopping a session cancels its warm-up."""
+    localstack = test_utils.make_test_RunningSession(
+        services=["s3", "sqs", "sns"], region_name="us-east-1", warm_up=True
+    )
+    started = threading.Event()
+
+    def _client(service_name):
+        started.set()
+        assert localstack.warm_up_cancelled.wait(timeout=10)
+
+    with mock.patch.object(localstack.botocore, "client", side_effect=_client):
+        localstack.start()
+        assert started.wait(timeout=10)
+        thread = localstack._warm_up_thread
+        localstack.stop()
+        assert not thread.is_alive()
+        assert localstack.botocore.client.call_count == 1
+
+
+def test_url_check():
+    """Test the check that patched requests only go to Localstack."""
+    localstack = test_utils.make_test_RunningSession(region_name="us-east-1")
+    check_url = localstack_botocore._make_url_check(localstack, "strict")
+    check_url("http://127.0.0.1:4566/")
+    check_url("http://data.127.0.0.1:4566/path")
+    for url in ["https://s3.amazonaws.com/", "https://s3.amazonaws.com/127.0.0.1"]:
+        with pytest.raises(AssertionError):
+            check_url(url)
+
+    check_url = localstack_botocore._make_url_check(localstack, "sampled")
+    with pytest.raises(AssertionError):
+        check_url("https://s3.amazonaws.com/")
+    for _ in range(localstack_botocore.HOST_CHECK_SAMPLE_RATE - 1):
+        check_url("https://s3.amazonaws.com/")
+    with pytest.raises(AssertionError):
+        check_url("https://s3.amazonaws.com/")
+
+    assert localstack_botocore._make_url_check(localstack, "off") is None
+
+
+@pytest.mark.parametrize("host_check", ["strict", "sampled", "off"])
+def test_patch_botocore_host_check(fake_localstack, host_check):
+    """Test patched clients with each host check."""
+    with fake_localstack.botocore.patch_botocore(host_check=host_check):
+        client = botocore.session.get_session().create_client("s3")
+        assert client.list_buckets()["Buckets"] == []
+    with pytest.raises(ValueError):
+        with fake_localstack.botocore.patch_botocore(host_check="sometimes"):
+            pass
+
+
+def test_shared_loader():
+    """Test that Localstack sessions share one botocore loader."""
+    first = test_utils.make_test_RunningSession(region_name="us-east-1")
+    second = test_utils.make_test_RunningSession(region_name="us-east-1")
+    loader = first.botocore.session().get_component("data_loader")
+    assert isinstance(loader, localstack_botocore.SharedLoader)
+    assert second.botocore.session().get_component("data_loader") is loader
+    assert botocore.session.get_session().get_component("data_loader") is not loader
+
+    first.botocore.client("sqs")
+    second.botocore.client("sqs")
+    files, uses = localstack_botocore.shared_loader_report()
+    assert uses >= 2
+    sqs_files = [path for path, _ in files if "sqs" in path and "service-2" in path]
+    assert len(sqs_files) == 1
+    assert all(size > 0 for _, size in files)
+
+    # boto3 Sessions add their data path to the loader.
+    first.boto3.session()
+    second.boto3.session()
+    assert len(loader.search_paths) == len(set(loader.search_paths))
+
+    terminalreporter = mock.Mock()
+    terminalreporter.config.getoption.return_value = 1
+    localstack_botocore.terminal_summary(terminalreporter)
+    terminalreporter.write_sep.assert_called_once_with("=", "localstack botocore data")
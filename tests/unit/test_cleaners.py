@@ -0,0 +1,96 @@
+"""Unit tests for pytest_localstack.cleaners."""
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack import cleaners, exceptions, services
+from pytest_localstack.utils import mock
+
+
+@pytest.fixture
+def reset_endpoint():
+    """Run a fake Localstack reset endpoint.
+
+    Yields a dict with the HTTP status the endpoint returns under
+    "status", the number of resets under "calls" and the server's
+    port under "port".
+    """
+    state = {"status": 200, "calls": 0}
+
+    def _reset(path):
+        state["calls"] += 1
+        return state["status"], b""
+
+    routes = {("POST", cleaners.RESET_PATH): _reset}
+    with test_utils.fake_http_server(routes) as port:
+        state["port"] = port
+        yield state
+
+
+def _make_session(port, services=("s3", "sqs")):
+    localstack_session = mock.Mock(services=list(services))
+    localstack_session.endpoint_url.return_value = "http://127.0.0.1:%i" % port
+    return localstack_session
+
+
+def test_reset_endpoint(reset_endpoint):
+    """Test resetting Localstack with its reset endpoint."""
+    localstack_session = _make_session(reset_endpoint["port"])
+    assert cleaners.reset(localstack_session) == "endpoint"
+    assert reset_endpoint["calls"] == 1
+    localstack_session.botocore.client.assert_not_called()
+
+    for status in (500, 401, 403):
+        reset_endpoint["status"] = status
+        with pytest.raises(exceptions.ServiceError):
+            cleaners.reset_endpoint(localstack_session)
+
+    for status in (400, 404, 405, 422):
+        reset_endpoint["status"] = status
+        assert cleaners.reset_endpoint(localstack_session) is False
+
+
+def test_reset_sweep(reset_endpoint):
+    """Test that reset cleans each service without a reset endpoint."""
+    reset_endpoint["status"] = 404
+    localstack_session = _make_session(
+        reset_endpoint["port"], services=["s3", "sqs", "apigateway"]
+    )
+    clients = {"s3": mock.Mock(), "sqs": mock.Mock()}
+    clients["s3"].list_buckets.return_value = {"Buckets": [{"Name": "bucket"}]}
+    clients["s3"].get_paginator.return_value.paginate.return_value = [
+        {"Versions": [{"Key": "key", "VersionId": "null"}]}
+    ]
+    clients["sqs"].list_queues.return_value = {"QueueUrls": ["http://queue"]}
+    localstack_session.botocore.client.side_effect = clients.get
+
+    assert cleaners.reset(localstack_session) == "sweep"
+
+    clients["s3"].delete_objects.assert_called_once_with(
+        Bucket="bucket", Delete={"Objects": [{"Key": "key", "VersionId": "null"}]}
+    )
+    clients["s3"].delete_bucket.assert_called_once_with(Bucket="bucket")
+    clients["sqs"].delete_queue.assert_called_once_with(QueueUrl="http://queue")
+
+
+def test_sweep_failure():
+    """Test that sweep reports the services it couldn't clean."""
+    localstack_session = mock.Mock(services=["s3", "sqs"])
+    client = mock.Mock()
+    client.list_buckets.side_effect = RuntimeError("boom")
+    client.list_queues.return_value = {}
+    localstack_session.botocore.client.return_value = client
+    with pytest.raises(exceptions.ServiceError, match="s3$"):
+        cleaners.sweep(localstack_session)
+
+
+def test_sweep_botocore_name():
+    """Test that sweep creates clients by the services' botocore names."""
+    localstack_session = mock.Mock(services=["s3"])
+    with mock.patch.dict(cleaners.CLEANERS, {"s3": mock.Mock()}), mock.patch.object(
+        services.SERVICES["s3"], "botocore_name", "s3-botocore"
+    ):
+        cleaners.sweep(localstack_session)
+        cleaners.CLEANERS["s3"].assert_called_once_with(
+            localstack_session.botocore.client.return_value
+        )
+    localstack_session.botocore.client.assert_called_once_with("s3-botocore")
@@ -1,5 +1,8 @@
+import gzip
 import logging
+import threading
 
+import pytest
 from tests import utils as test_utils
 
 from pytest_localstack import container as ptls_container, session
@@ -30,3 +33,161 @@ def test_DockerLogTailer(caplog):
         for log_line in test_utils.generate_fake_logs():
             log_line = log_line.decode("utf-8").rstrip()
             assert (logger_name, log_level, log_line) in caplog.record_tuples
+
+
+def test_DockerLogTailer_watch():
+    """Test pytest_localstack.container.DockerLogTailer.watch."""
+    container = test_utils.make_mock_container(session.LocalstackSession.image_name)
+    logger = logging.getLogger("test_logger.%s." % container.short_id)
+    tailer = ptls_container.DockerLogTailer(container, logger, logging.DEBUG)
+    found = tailer.watch(r"^foobar 3$")
+    not_found = tailer.watch(r"^foobar 42$")
+    tailer.start()
+    tailer.join(1)
+    assert found.is_set()
+    assert not not_found.is_set()
+
+
+def test_LogRingBuffer():
+    """Test pytest_localstack.container.LogRingBuffer."""
+    buffer = ptls_container.LogRingBuffer(max_lines=3)
+    for i in range(5):
+        buffer.append("line %i" % i)
+    assert buffer.lines() == ["line 2", "line 3", "line 4"]
+    assert buffer.size == 18
+    assert buffer.dropped == 2
+
+    buffer = ptls_container.LogRingBuffer(max_bytes=10)
+    for line in ["aaaa", "bbbb", "cccc"]:
+        buffer.append(line)
+    assert buffer.lines() == ["bbbb", "cccc"]
+    buffer.append("d" * 20)
+    assert buffer.lines() == ["d" * 20]
+    assert len(buffer) == 1
+
+    # Lines are measured in bytes, not characters.
+    buffer = ptls_container.LogRingBuffer(max_bytes=10)
+    for line in ["ééé", "üüü"]:
+        buffer.append(line)
+    assert buffer.lines() == ["üüü"]
+    assert buffer.size == 6
+
+    with pytest.raises(ValueError):
+        ptls_container.LogRingBuffer(max_lines=0)
+
+
+def test_DockerLogTailer_buffer():
+    """Test that DockerLogTailer can buffer lines without logging them."""
+    container = test_utils.make_mock_container(session.LocalstackSession.image_name)
+    buffer = ptls_container.LogRingBuffer(max_lines=2)
+    tailer = ptls_container.DockerLogTailer(
+        container, None, logging.DEBUG, buffer=buffer
+    )
+    tailer.start()
+    tailer.join(1)
+    expected = [
+        line.decode("utf-8").rstrip() for line in test_utils.generate_fake_logs()
+    ]
+    assert buffer.lines() == expected[-2:]
+
+
+def test_DockerLogReader(caplog):
+    """Test pytest_localstack.container.DockerLogReader."""
+    container = test_utils.make_mock_container(session.LocalstackSession.image_name)
+    logger = logging.getLogger("test_logger.%s" % container.short_id)
+    reader = ptls_container.DockerLogReader(container, logger, logging.DEBUG)
+    found = reader.watch(r"^foobar 3$")
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        reader.start()
+        reader.join(1)
+    assert not reader.is_alive()
+    container.attach.assert_called_once_with(
+        stdout=True, stderr=True, stream=True, logs=True, demux=True
+    )
+    assert found.is_set()
+    expected = [
+        (logger.name + ".stdout", logging.DEBUG, line.decode("utf-8").rstrip())
+        for line in test_utils.generate_fake_logs()
+    ]
+    expected.append((logger.name + ".stderr", logging.DEBUG, "error"))
+    assert caplog.record_tuples == expected
+
+
+def test_DockerLogReader_stop():
+    """Test that DockerLogReader.stop closes the stream and joins the thread."""
+    container = test_utils.make_mock_container(session.LocalstackSession.image_name)
+    stream = test_utils.FakeStream(iter(lambda: (b"foobar\n", None), None))
+    container.attach.side_effect = None
+    container.attach.return_value = stream
+    reader = ptls_container.DockerLogReader(container, None, logging.DEBUG)
+    reader.start()
+    reader.stop(timeout=1)
+    assert stream.closed
+    assert not reader.is_alive()
+
+
+def test_LogFileSink(tmp_path):
+    """Test pytest_localstack.container.LogFileSink."""
+    path = str(tmp_path / "localstack.log")
+    sink = ptls_container.LogFileSink(path, max_bytes=10, backup_count=2)
+    for chunk in [b"aaaaaa", b"bbbbbb", b"cccc", b"dddddd", b"eeeeeeeeeeee"]:
+        sink.write(chunk)
+    sink.close()
+    assert (tmp_path / "localstack.log").read_bytes() == b"eeeeeeeeeeee"
+    assert (tmp_path / "localstack.log.1").read_bytes() == b"dddddd"
+    assert (tmp_path / "localstack.log.2").read_bytes() == b"bbbbbbcccc"
+    assert not (tmp_path / "localstack.log.3").exists()
+
+    sink = ptls_container.LogFileSink(path, max_bytes=10, compress=True)
+    assert sink.path == path + ".gz"
+    for chunk in [b"aaaaaa", b"bbbbbb"]:
+        sink.write(chunk)
+    sink.close()
+    assert gzip.open(sink.path).read() == b"bbbbbb"
+    assert gzip.open(path + ".1.gz").read() == b"aaaaaa"
+
+
+def test_LogFileSink_existing(tmp_path):
+    """Test that LogFileSink keeps the log of an earlier session."""
+    path = str(tmp_path / "localstack.log")
+    for chunk in [b"first", b"second"]:
+        sink = ptls_container.LogFileSink(path)
+        sink.write(chunk)
+        sink.close()
+    assert (tmp_path / "localstack.log").read_bytes() == b"second"
+    assert (tmp_path / "localstack.log.1").read_bytes() == b"first"
+
+
+def test_DockerLogReader_sink(tmp_path, caplog):
+    """Test that DockerLogReader copies raw logs to a sink."""
+    container = test_utils.make_mock_container(session.LocalstackSession.image_name)
+    sink = ptls_container.LogFileSink(str(tmp_path / "localstack.log"))
+    reader = ptls_container.DockerLogReader(container, None, logging.DEBUG, sink=sink)
+    with mock.patch.object(reader, "_handle_line") as handle_line:
+        reader.start()
+        reader.join(1)
+    handle_line.assert_not_called()
+    assert (tmp_path / "localstack.log").read_bytes() == (
+        b"".join(test_utils.generate_fake_logs()) + b"error"
+    )
+
+
+def test_ContainerReaper():
+    """Test pytest_localstack.container.ContainerReaper."""
+    release = threading.Event()
+    containers = []
+    for _ in range(3):
+        container = test_utils.make_mock_container(session.LocalstackSession.image_name)
+        container.stop.side_effect = lambda timeout: release.wait(5)
+        containers.append(container)
+    containers[-1].stop.side_effect = Exception("oops")
+
+    reaper = ptls_container.ContainerReaper()
+    for container in containers:
+        reaper.stop(container, timeout=3)
+    assert reaper.drain(timeout=0.1) == 2
+    release.set()
+    assert reaper.drain() == 0
+    for container in containers:
+        container.stop.assert_called_once_with(timeout=3)
+    reaper.close()
@@ -0,0 +1,53 @@
+"""Unit tests for LocalstackEndpointResolver."""
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack import exceptions
+from pytest_localstack.contrib import botocore as localstack_botocore
+
+
+def _make_resolver(**kwargs):
+    localstack = test_utils.make_test_RunningSession(**kwargs)
+    loader = localstack.botocore.session().get_component("data_loader")
+    endpoints = loader.load_data("endpoints")
+    return localstack, localstack_botocore.LocalstackEndpointResolver(
+        localstack, endpoints
+    )
+
+
+def test_construct_endpoint_cached():
+    """Test that resolved endpoints are cached and returned as copies."""
+    localstack, resolver = _make_resolver(region_name="us-west-2")
+    first = resolver.construct_endpoint("sqs")
+    assert first["hostname"] == "127.0.0.1:4566"
+    assert first["endpointName"] == "us-west-2"
+    assert first["protocols"] == ["http"]
+    assert "sslCommonName" not in first
+
+    first["hostname"] = "mutated"
+    second = resolver.construct_endpoint("sqs", region_name="us-west-2")
+    assert second["hostname"] == "127.0.0.1:4566"
+    assert list(resolver._endpoints) == [("sqs", "us-west-2")]
+
+    # The endpoint data shared with botocore isn't modified.
+    for partition in resolver._endpoint_data["partitions"]:
+        for endpoint in partition["services"]["sqs"]["endpoints"].values():
+            assert "hostname" not in endpoint or "127.0.0.1" not in endpoint["hostname"]
+
+    localstack.edge_port = 1234
+    assert resolver.construct_endpoint("sqs")["hostname"] == "127.0.0.1:1234"
+
+    with pytest.raises(exceptions.RegionError):
+        resolver.construct_endpoint("sqs", region_name="eu-west-1")
+
+
+def test_get_available_endpoints():
+    """Test that only the session region and aws-global are available."""
+    localstack, resolver = _make_resolver(region_name="us-west-2")
+    assert resolver.valid_regions == {"us-west-2", "aws-global"}
+    assert resolver.get_available_endpoints("sqs") == ["us-west-2"]
+    assert set(resolver.get_available_endpoints("iam")) <= {"aws-global"}
+    assert len(resolver.get_available_endpoints("sqs", allow_non_regional=True)) > 1
+    assert resolver.get_available_endpoints("not-a-service") == []
+    with pytest.raises(exceptions.UnsupportedPartitionError):
+        resolver.get_available_endpoints("sqs", partition_name="aws-cn")
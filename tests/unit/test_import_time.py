@@ -0,0 +1,64 @@
+"""Track how long importing the pytest plugin takes.
+
+Every pytest run imports :mod:`pytest_localstack`, so it must not
+import docker, botocore or boto3 until a Localstack session is used.
+"""
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "boto3",
+    "botocore",
+    "docker",
+    "pytest_localstack.session",
+    "pytest_localstack.shared",
+]
+
+
+def import_times(statement):
+    """Run `statement` under ``python -X importtime``.
+
+    Returns:
+        dict: Module names to their cumulative import time in microseconds.
+
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs PEP 562")
+def test_import_time(record_property):
+    """Test that importing the plugin doesn't import heavy dependencies."""
+    # pytest is always imported first when the plugin is loaded.
+    times = import_times("import pytest; import pytest_localstack")
+    record_property("import_time_us", times["pytest_localstack"])
+    assert [name for name in HEAVY_MODULES if name in times] == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs PEP 562")
+def test_contributed_names_load_plugins():
+    """Test that contributed module attributes load the default plugins."""
+    # importlib.import_module() imports don't show up in -X importtime.
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import sys, pytest_localstack; pytest_localstack.patch_fixture; "
+            "print('pytest_localstack.contrib.botocore' in sys.modules)",
+        ],
+        universal_newlines=True,
+    )
+    assert output.strip() == "True"
@@ -0,0 +1,47 @@
+"""Unit tests for LocalstackSession port mapping."""
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack import constants, exceptions, session
+
+
+def test_map_port_cached():
+    """Test that published ports are read once after the container starts."""
+    test_session = test_utils.make_test_LocalstackSession(services=["s3"])
+    test_session.start()
+    test_session._container.reload.assert_called_once_with()
+
+    for _ in range(3):
+        assert test_session.map_port(constants.EDGE_PORT) == constants.EDGE_PORT
+        assert test_session.endpoint_url("s3") == "http://127.0.0.1:%i" % (
+            constants.EDGE_PORT
+        )
+    test_session.docker_client.api.port.assert_not_called()
+
+    # Ports that weren't published at start are looked up once.
+    assert test_session.map_port(1234) == 1234
+    assert test_session.map_port(1234) == 1234
+    test_session.docker_client.api.port.assert_called_once()
+
+    test_session.stop()
+    with pytest.raises(exceptions.ContainerNotStartedError):
+        test_session.map_port(constants.EDGE_PORT)
+    assert test_session._ports == {}
+
+
+def test_published_ports():
+    """Test pytest_localstack.session._published_ports."""
+    attrs = {
+        "NetworkSettings": {
+            "Ports": {
+                "4566/tcp": [
+                    {"HostIp": "0.0.0.0", "HostPort": "32768"},
+                    {"HostIp": "::", "HostPort": "32768"},
+                ],
+                "4571/tcp": None,
+                "53/udp": [{"HostIp": "0.0.0.0", "HostPort": "32769"}],
+            }
+        }
+    }
+    assert session._published_ports(attrs) == {4566: 32768}
+    assert session._published_ports({}) == {}
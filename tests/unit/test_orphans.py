@@ -0,0 +1,108 @@
+"""Unit tests for pytest_localstack.orphans."""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import docker
+
+from pytest_localstack import constants, orphans
+from pytest_localstack.utils import mock
+
+
+def exited_pid():
+    """Return the PID of a process that has exited."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def make_mock_container(name, labels):
+    container = mock.Mock(spec=docker.models.containers.Container)
+    container.name = name
+    container.short_id = name[:6]
+    container.labels = labels
+    return container
+
+
+def test_container_labels():
+    """Test pytest_localstack.orphans.container_labels."""
+    labels = orphans.container_labels(ttl=60)
+    assert labels[constants.LABEL_PID] == str(os.getpid())
+    assert labels[constants.LABEL_HOST] == socket.gethostname()
+    assert labels[constants.LABEL_PID_NAMESPACE] == orphans._pid_namespace()
+    assert abs(int(labels[constants.LABEL_STARTED]) - time.time()) < 5
+    assert labels[constants.LABEL_TTL] == "60"
+    assert orphans.orphan_reason(labels) is None
+
+    labels = orphans.container_labels(owner_pid=42, ttl=None)
+    assert labels[constants.LABEL_PID] == "42"
+    assert labels[constants.LABEL_TTL] == ""
+
+
+def test_orphan_reason():
+    """Test pytest_localstack.orphans.orphan_reason."""
+    labels = orphans.container_labels(ttl=60)
+    now = time.time()
+    assert orphans.orphan_reason(labels, now=now + 30) is None
+    assert orphans.orphan_reason(labels, now=now + 120) == "expired"
+
+    pid = exited_pid()
+    labels = orphans.container_labels(owner_pid=pid, ttl=None)
+    assert orphans.orphan_reason(labels) == "owner %i exited" % pid
+    # The owner ran in another PID namespace, so only the TTL counts.
+    labels[constants.LABEL_PID_NAMESPACE] = "elsewhere"
+    assert orphans.orphan_reason(labels) is None
+    del labels[constants.LABEL_PID_NAMESPACE]
+    assert orphans.orphan_reason(labels) is None
+    # Likewise if the owner ran on another host.
+    labels = orphans.container_labels(owner_pid=pid, ttl=None)
+    labels[constants.LABEL_HOST] = "elsewhere"
+    assert orphans.orphan_reason(labels) is None
+
+    assert orphans.orphan_reason({}) is None
+    assert orphans.orphan_reason({constants.LABEL_PID: "?"}) is None
+
+
+def test_remove_orphans():
+    """Test pytest_localstack.orphans.remove_orphans."""
+    running = make_mock_container("running", orphans.container_labels())
+    expired = make_mock_container("expired", orphans.container_labels(ttl=60))
+    expired.labels[constants.LABEL_STARTED] = str(int(time.time() - 120))
+    exited = make_mock_container(
+        "exited", orphans.container_labels(owner_pid=exited_pid())
+    )
+    gone = make_mock_container("gone", orphans.container_labels(ttl=60))
+    gone.labels[constants.LABEL_STARTED] = "0"
+    gone.remove.side_effect = docker.errors.NotFound("gone")
+    docker_client = mock.Mock(spec=docker.client.DockerClient)
+    docker_client.containers.list.return_value = [running, expired, exited, gone]
+
+    found = orphans.remove_orphans(docker_client, dry_run=True)
+    assert [c.name for c, _ in found] == ["expired", "exited", "gone"]
+    docker_client.containers.list.assert_called_with(
+        all=True, filters={"label": constants.LABEL_PID}
+    )
+    expired.remove.assert_not_called()
+
+    removed = orphans.remove_orphans(docker_client)
+    assert sorted(c.name for c, _ in removed) == ["exited", "expired"]
+    for container in [expired, exited, gone]:
+        container.remove.assert_called_once_with(force=True)
+    running.remove.assert_not_called()
+
+    removed = orphans.remove_orphans(docker_client, include_all=True)
+    assert ("running", "all") in [(c.name, reason) for c, reason in removed]
+
+
+def test_main(capsys):
+    """Test the pytest-localstack reap command."""
+    expired = make_mock_container("expired", orphans.container_labels(ttl=None))
+    expired.labels[constants.LABEL_PID] = str(exited_pid())
+    docker_client = mock.Mock(spec=docker.client.DockerClient)
+    docker_client.containers.list.return_value = [expired]
+    with mock.patch("docker.from_env", return_value=docker_client):
+        assert orphans.main(["reap", "--dry-run"]) == 0
+    assert capsys.readouterr().out.startswith("expire expired (owner ")
+    expired.remove.assert_not_called()
@@ -0,0 +1,51 @@
+"""Unit tests for pytest_localstack.pool."""
+from tests import utils as test_utils
+
+from pytest_localstack import container, pool
+from pytest_localstack.utils import mock
+
+
+def test_config_key():
+    """Test pytest_localstack.pool.config_key."""
+    key = pool.config_key(services=["s3", "sqs"], region_name="us-east-1")
+    assert key == pool.config_key(region_name="us-east-1", services=["sqs", "s3"])
+    assert key != pool.config_key(services=["s3", "sqs"], region_name="us-west-2")
+    assert key != pool.config_key(services=["s3"], region_name="us-east-1")
+
+
+def test_SessionPool():
+    """Test pytest_localstack.pool.SessionPool."""
+    factory = mock.Mock(side_effect=test_utils.make_test_LocalstackSession)
+    session_pool = pool.SessionPool()
+
+    session_1 = session_pool.acquire("foo", factory)
+    session_2 = session_pool.acquire("foo", factory)
+    assert session_1 is not session_2
+    assert factory.call_count == 2
+
+    session_pool.release(session_1)
+    assert session_pool.acquire("foo", factory) is session_1
+    assert factory.call_count == 2
+
+    session_pool.release(session_1)
+    session_3 = session_pool.acquire("bar", factory)
+    assert session_3 not in (session_1, session_2)
+    assert factory.call_count == 3
+
+    for session in (session_1, session_2, session_3):
+        session.start()
+    session_pool.close(timeout=1)
+    for session in (session_1, session_2, session_3):
+        assert session._container is None
+
+
+def test_SessionPool_close_reaper():
+    """Test that SessionPool.close can stop the containers with a reaper."""
+    session_pool = pool.SessionPool()
+    test_session = session_pool.acquire("foo", test_utils.make_test_LocalstackSession)
+    test_session.start()
+    docker_container = test_session._container
+    reaper = mock.Mock(spec=container.ContainerReaper)
+    session_pool.close(timeout=1, reaper=reaper)
+    reaper.stop.assert_called_once_with(docker_container, timeout=1)
+    docker_container.stop.assert_not_called()
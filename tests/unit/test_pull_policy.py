@@ -0,0 +1,66 @@
+"""Unit tests for LocalstackSession image pull policies."""
+import time
+
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack import session
+
+
+@pytest.mark.parametrize(
+    "pull_image,expected",
+    [
+        (True, ("always", None)),
+        (False, ("never", None)),
+        ("always", ("always", None)),
+        ("if-missing", ("if-missing", None)),
+        ("never", ("never", None)),
+        ("if-older-than=2h", ("if-older-than", 2 * 60 * 60)),
+    ],
+)
+def test_parse_pull_policy(pull_image, expected):
+    """Test pytest_localstack.session.parse_pull_policy."""
+    assert session.parse_pull_policy(pull_image) == expected
+
+
+@pytest.mark.parametrize("pull_image", ["sometimes", "if-missing=1h", "if-older-than"])
+def test_parse_pull_policy_invalid(pull_image):
+    """Test pytest_localstack.session.parse_pull_policy with invalid policies."""
+    with pytest.raises(ValueError):
+        session.parse_pull_policy(pull_image)
+
+
+@pytest.mark.parametrize(
+    "pull_image,image_present,last_pulled,should_pull",
+    [
+        (True, True, None, True),
+        (False, False, None, False),
+        ("if-missing", False, None, True),
+        ("if-missing", True, None, False),
+        ("if-older-than=1h", False, time.time(), True),
+        ("if-older-than=1h", True, None, True),
+        ("if-older-than=1h", True, time.time() - 2 * 60 * 60, True),
+        ("if-older-than=1h", True, time.time() - 60, False),
+    ],
+)
+def test_LocalstackSession_pull_policy(
+    pull_image, image_present, last_pulled, should_pull
+):
+    """Test that LocalstackSession only pulls images when its policy says so."""
+    image_pull_times = {}
+    if last_pulled is not None:
+        image_pull_times["localstack/localstack:latest"] = last_pulled
+    test_session = test_utils.make_test_LocalstackSession(
+        pull_image=pull_image, image_pull_times=image_pull_times
+    )
+    images = test_session.docker_client.images
+    images.list.return_value = [object()] if image_present else []
+
+    test_session.start()
+    test_session.stop()
+
+    assert images.pull.called == should_pull
+    if should_pull:
+        images.pull.assert_called_once_with("localstack/localstack:latest")
+        pulled = image_pull_times["localstack/localstack:latest"]
+        assert time.time() - pulled < 60
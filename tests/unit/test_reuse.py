@@ -0,0 +1,137 @@
+"""Unit tests for pytest_localstack.reuse."""
+import os
+import time
+
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack import constants, orphans, reuse
+from pytest_localstack.utils import mock
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmpdir):
+    with mock.patch.object(reuse, "STATE_DIR", str(tmpdir)):
+        yield str(tmpdir)
+
+
+def test_ReusedSessions():
+    """Test pytest_localstack.reuse.ReusedSessions."""
+    docker_client = test_utils.make_mock_docker_client()
+    docker_client.containers.list.return_value = []
+    started = test_utils.make_test_LocalstackSession()
+
+    def _start_session(labels):
+        assert labels == {
+            constants.LABEL_CONFIG: "foo",
+            constants.LABEL_IDLE_TTL: "60",
+        }
+        started.start()
+        return started
+
+    start_session = mock.Mock(side_effect=_start_session)
+    attach_session = mock.Mock()
+    reused = reuse.ReusedSessions(idle_ttl=60)
+    assert reused.get("foo", docker_client, start_session, attach_session) is started
+    assert reused.get("foo", docker_client, start_session, attach_session) is started
+    assert start_session.call_count == 1
+    assert not attach_session.called
+    docker_client.containers.list.assert_called_once_with(
+        filters={"label": "pytest-localstack.config=foo", "status": "running"}
+    )
+    assert reuse.last_used("foo") is not None
+    assert reuse.last_used("bar") is None
+
+    # The container keeps running for the next test run.
+    container = started._container
+    reused.close()
+    assert started._container is None
+    assert container.status == "running"
+    container.stop.assert_not_called()
+
+    docker_client.containers.list.return_value = [container]
+    reused = reuse.ReusedSessions(idle_ttl=60)
+    attached = reused.get("foo", docker_client, start_session, attach_session)
+    assert attached is attach_session.return_value
+    attach_session.assert_called_once_with(container)
+    assert start_session.call_count == 1
+
+
+def test_ReusedSessions_acquire():
+    """Test that sessions in use aren't handed out again."""
+    docker_client = test_utils.make_mock_docker_client()
+    docker_client.containers.list.return_value = []
+    start_session = mock.Mock(side_effect=lambda labels: mock.Mock(labels=labels))
+    reused = reuse.ReusedSessions()
+    first = reused.acquire("foo", docker_client, start_session, mock.Mock())
+    second = reused.acquire("foo", docker_client, start_session, mock.Mock())
+    assert second is not first
+    assert first.labels[constants.LABEL_CONFIG] == "foo"
+    assert second.labels[constants.LABEL_CONFIG] == "foo-2"
+
+    reused.release(first)
+    assert reused.acquire("foo", docker_client, start_session, mock.Mock()) is first
+    assert start_session.call_count == 2
+    reused.close()
+
+
+def test_ReusedSessions_touch():
+    """Test that held containers keep being marked as used."""
+    docker_client = test_utils.make_mock_docker_client()
+    docker_client.containers.list.return_value = []
+    start_session = mock.Mock()
+    used_path = os.path.join(reuse.STATE_DIR, "reuse-foo.used")
+
+    # Every use counts.
+    reused = reuse.ReusedSessions(idle_ttl=60, touch_interval=60)
+    reused.get("foo", docker_client, start_session, mock.Mock())
+    os.utime(used_path, (0, 0))
+    reused.get("foo", docker_client, start_session, mock.Mock())
+    assert reuse.last_used("foo") > 0
+    reused.close()
+
+    # So does holding the container.
+    reused = reuse.ReusedSessions(idle_ttl=60, touch_interval=0.05)
+    reused.get("foo", docker_client, start_session, mock.Mock())
+    os.utime(used_path, (0, 0))
+    deadline = time.time() + 10
+    while reuse.last_used("foo") == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert reuse.last_used("foo") > 0
+    reused.close()
+    assert reused._toucher is None
+
+
+def test_ReusedSessions_not_positive():
+    """Test that ReusedSessions rejects intervals that would busy-loop."""
+    with pytest.raises(ValueError):
+        reuse.ReusedSessions(idle_ttl=0)
+    with pytest.raises(ValueError):
+        reuse.ReusedSessions(idle_ttl=60, touch_interval=-1)
+
+
+def test_ReusedSessions_unusable_container():
+    """Test that containers that can't be attached to are replaced."""
+    container = test_utils.make_mock_container("localstack/localstack")
+    docker_client = test_utils.make_mock_docker_client()
+    docker_client.containers.list.return_value = [container]
+    start_session = mock.Mock()
+    attach_session = mock.Mock(side_effect=Exception("unresponsive"))
+    reused = reuse.ReusedSessions()
+    session = reused.get("foo", docker_client, start_session, attach_session)
+    assert session is start_session.return_value
+    container.remove.assert_called_once_with(force=True)
+
+
+def test_idle_orphans():
+    """Test that reused containers are only orphans once idle."""
+    labels = orphans.container_labels(owner_pid=2**22 + 1, ttl=None)
+    labels.update(reuse.container_labels("foo", idle_ttl=60))
+    now = time.time()
+    assert orphans.orphan_reason(labels, now=now) is None
+    assert orphans.orphan_reason(labels, now=now + 120) == "idle"
+
+    reuse.touch("foo")
+    used = time.time() + 100
+    os.utime(os.path.join(reuse.STATE_DIR, "reuse-foo.used"), (used, used))
+    assert orphans.orphan_reason(labels, now=now + 120) is None
@@ -0,0 +1,155 @@
+"""Unit tests for Localstack service checks."""
+import json
+import threading
+import time
+
+import pytest
+from tests import utils as test_utils
+
+from pytest_localstack import exceptions, service_checks, services, session
+from pytest_localstack.utils import mock
+
+
+@pytest.fixture
+def health_endpoint():
+    """Run a fake Localstack health endpoint.
+
+    Yields a dict of paths to the JSON documents the endpoint serves.
+    The server's port is stored under the "port" key.
+    """
+    documents = {}
+
+    def _get(path):
+        if path not in documents:
+            return 404, b"not found"
+        return 200, json.dumps(documents[path]).encode("utf-8")
+
+    with test_utils.fake_http_server({("GET", None): _get}) as port:
+        documents["port"] = port
+        yield documents
+
+
+def _make_checks(slow_services=(), broken_services=()):
+    barrier = threading.Barrier(len(slow_services) or 1, timeout=5)
+
+    def _make_check(service_name):
+        def _check(localstack_session):
+            if service_name in broken_services:
+                raise exceptions.ServiceError(service_name=service_name)
+            if service_name in slow_services:
+                # Only passes if every slow service is checked concurrently.
+                barrier.wait()
+
+        return services.Service(service_name, _check)
+
+    return {
+        service_name: _make_check(service_name) for service_name in services.SERVICES
+    }
+
+
+def test_check_services_concurrently():
+    """Test that RunningSession._check_services checks services concurrently."""
+    slow_services = ["s3", "sqs", "sns", "dynamodb"]
+    test_session = session.RunningSession("127.0.0.1", services=slow_services)
+    with mock.patch.object(session, "SERVICES", _make_checks(slow_services)):
+        with mock.patch.object(service_checks.HealthCheck, "paths", ()):
+            test_session._check_services(timeout=10)
+    assert set(test_session.ready_services) == set(slow_services)
+    assert not test_session.pending_services
+
+
+def test_check_services_timeout():
+    """Test that RunningSession._check_services reports pending services."""
+    test_session = session.RunningSession("127.0.0.1", services=["s3", "sqs"])
+    checks = _make_checks(broken_services=["sqs"])
+    with mock.patch.object(session, "SERVICES", checks):
+        with mock.patch.object(service_checks.HealthCheck, "paths", ()):
+            with pytest.raises(exceptions.TimeoutError, match="not started: sqs$"):
+                test_session._check_services(timeout=0.1)
+    assert set(test_session.ready_services) == {"s3"}
+    assert test_session.pending_services == {"sqs"}
+
+
+def test_HealthCheck(health_endpoint):
+    """Test pytest_localstack.service_checks.HealthCheck."""
+    test_session = session.RunningSession(
+        "127.0.0.1",
+        services=["s3", "sqs", "cognito", "kinesis"],
+        edge_port=health_endpoint["port"],
+    )
+    health_endpoint["/health"] = {
+        "services": {
+            "s3": "running",
+            "sqs": "available",
+            "cognito-identity": "running",
+            "kinesis": "initializing",
+        }
+    }
+    health_check = service_checks.HealthCheck(test_session)
+    try:
+        assert health_check() == {"s3", "sqs", "cognito"}
+
+        health_endpoint["/health"]["services"]["kinesis"] = "running"
+        assert health_check() == {"s3", "sqs", "cognito", "kinesis"}
+    finally:
+        health_check.close()
+
+    with mock.patch.object(service_checks.HealthCheck, "paths", ("/missing",)):
+        with pytest.raises(exceptions.HealthEndpointNotFoundError):
+            service_checks.HealthCheck(test_session)()
+
+
+def test_check_services_health(health_endpoint):
+    """Test RunningSession._check_services with a health endpoint."""
+    health_endpoint["/_localstack/health"] = {
+        "services": {"s3": "running", "sqs": "running"}
+    }
+    test_session = session.RunningSession(
+        "127.0.0.1", services=["s3", "sqs"], edge_port=health_endpoint["port"]
+    )
+    checks = _make_checks(broken_services=["sqs"])
+    with mock.patch.object(session, "SERVICES", checks):
+        test_session._check_services(timeout=1)
+        assert set(test_session.ready_services) == {"s3", "sqs"}
+
+        # Deep checks still call each service.
+        test_session.deep_service_checks = True
+        with pytest.raises(exceptions.TimeoutError, match="not started: sqs$"):
+            test_session._check_services(timeout=0.1)
+
+
+def test_ProbeClientCache():
+    """Test pytest_localstack.service_checks.ProbeClientCache."""
+    cache = service_checks.ProbeClientCache()
+    create_client = mock.Mock(side_effect=lambda: object())
+
+    client = cache.get("s3", create_client)
+    assert cache.get("s3", create_client) is client
+    assert cache.get("s3", create_client) is client
+    assert cache.get("sqs", create_client) is not client
+    assert create_client.call_count == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.saved_time == pytest.approx(cache.create_time)
+
+    cache.clear()
+    assert cache.get("s3", create_client) is not client
+    assert create_client.call_count == 3
+
+
+def test_check_services_ready_event(health_endpoint):
+    """Test that RunningSession._check_services waits for `ready_event`."""
+    health_endpoint["/health"] = {"services": {"s3": "running"}}
+    test_session = session.RunningSession(
+        "127.0.0.1", services=["s3"], edge_port=health_endpoint["port"]
+    )
+    ready_event = threading.Event()
+    threading.Timer(0.5, ready_event.set).start()
+    start_time = time.time()
+    test_session._check_services(timeout=10, ready_event=ready_event)
+    assert 0.5 <= time.time() - start_time < 5
+
+    # Services are still checked if the event never happens.
+    test_session._check_services(
+        timeout=10, ready_event=threading.Event(), ready_event_fallback_delay=0.1
+    )
+    assert set(test_session.ready_services) == {"s3"}
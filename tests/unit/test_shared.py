@@ -0,0 +1,75 @@
+"""Unit tests for pytest_localstack.shared."""
+import os
+
+from tests import utils as test_utils
+
+from pytest_localstack import shared
+from pytest_localstack.utils import mock
+
+
+def test_SharedContainer(tmpdir):
+    """Test pytest_localstack.shared.SharedContainer."""
+    starter = shared.SharedContainer(str(tmpdir), "foo")
+    attacher = shared.SharedContainer(str(tmpdir), "foo")
+    docker_client = test_utils.make_mock_docker_client()
+
+    def _start_session():
+        test_session = test_utils.make_test_LocalstackSession()
+        test_session.start()
+        return test_session
+
+    def _attach_session(state):
+        test_session = test_utils.make_test_RunningSession(edge_port=state["edge_port"])
+        test_session.start()
+        return test_session
+
+    attach_session = mock.Mock(side_effect=_attach_session)
+
+    started = starter.acquire(_start_session, attach_session)
+    container = started._container
+    assert not attach_session.called
+
+    attached = attacher.acquire(_start_session, attach_session)
+    assert attach_session.called
+    assert attached.service_hostname("s3") == started.service_hostname("s3")
+
+    # The starter leaves first, the container keeps running.
+    starter.release(started, docker_client)
+    assert started._container is None
+    assert container.status == "running"
+    assert os.path.exists(starter.path)
+
+    # The last one out stops the container.
+    attacher.release(attached, docker_client)
+    docker_client.containers.get.assert_called_once_with(container.id)
+    docker_client.containers.get.return_value.stop.assert_called_once_with(timeout=10)
+    assert not os.path.exists(starter.path)
+
+
+def test_SharedContainer_dead_container(tmpdir):
+    """Test that a published container that isn't running is replaced."""
+    shared_container = shared.SharedContainer(str(tmpdir), "foo")
+    with shared_container.locked():
+        shared_container.write_state(
+            {
+                "container_id": "dead",
+                "hostname": "127.0.0.1",
+                "edge_port": 4566,
+                "references": 1,
+            }
+        )
+    docker_client = test_utils.make_mock_docker_client()
+    docker_client.containers.get.return_value.status = "exited"
+    started = test_utils.make_test_LocalstackSession()
+    started.start()
+    attach_session = mock.Mock()
+
+    session = shared_container.acquire(lambda: started, attach_session, docker_client)
+    assert session is started
+    assert not attach_session.called
+    docker_client.containers.get.assert_called_once_with("dead")
+    with shared_container.locked():
+        state = shared_container.read_state()
+    assert state["container_id"] == started._container.id
+    assert state["references"] == 1
+    started.stop()
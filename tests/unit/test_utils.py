@@ -76,3 +76,32 @@ def test_get_version_tuple():
     assert utils.get_version_tuple("1.2.3") == (1, 2, 3)
     with pytest.raises(ValueError):
         utils.get_version_tuple("latest")
+
+
+def test_parse_duration():
+    assert utils.parse_duration("30") == 30
+    assert utils.parse_duration("30s") == 30
+    assert utils.parse_duration("1.5m") == 90
+    assert utils.parse_duration("12h") == 12 * 60 * 60
+    assert utils.parse_duration("7d") == 7 * 24 * 60 * 60
+    for duration in ["", "h", "-1h", "1w", "one hour"]:
+        with pytest.raises(ValueError):
+            utils.parse_duration(duration)
+
+
+def test_LRUCache():
+    cache = utils.LRUCache(2)
+    assert cache.get("a", lambda: 1) == 1
+    assert cache.get("b", lambda: 2) == 2
+    assert cache.get("a", lambda: 3) == 1  # "b" is now least recently used
+    assert cache.get("c", lambda: 4) == 4
+    assert len(cache) == 2
+    assert cache.get("b", lambda: 5) == 5
+    assert (cache.hits, cache.misses) == (1, 4)
+    cache.clear()
+    assert len(cache) == 0
+
+    cache = utils.LRUCache()
+    for i in range(100):
+        cache.get(i, lambda: i)
+    assert len(cache) == 100
@@ -1,5 +1,8 @@
 """Test utils."""
+import contextlib
 import hashlib
+import http.server
+import threading
 
 import docker
 
@@ -43,6 +46,15 @@ def make_mock_container(
         "sha256:" + hashlib.sha256(container.name.encode("utf-8")).hexdigest()
     )
     container.short_id = container.id.split(":")[1][:6]
+    # Publish each port on the same host port, like make_mock_docker_client().
+    container.attrs = {
+        "NetworkSettings": {
+            "Ports": {
+                "%s/tcp" % port: [{"HostIp": "0.0.0.0", "HostPort": str(port)}]
+                for port in (kwargs.get("ports") or {})
+            }
+        }
+    }
 
     def _stop(timeout=10):
         container.status = "exited"
@@ -65,9 +77,49 @@ def make_mock_container(
             return b"".join(logs_generator)
 
     container.logs.side_effect = _logs
+
+    def _attach(
+        stdout=True, stderr=True, stream=False, logs=False, demux=False, **kwargs
+    ):
+        assert stream and demux
+        return FakeStream(generate_fake_frames())
+
+    container.attach.side_effect = _attach
     return container
 
 
+def generate_fake_frames(n=10, frame_size=7):
+    """Generate fake demultiplexed (stdout, stderr) log frames.
+
+    The lines of :func:`generate_fake_logs` are split into stdout
+    frames of `frame_size` bytes, followed by an unterminated line
+    on stderr.
+    """
+    logs = b"".join(generate_fake_logs(n))
+    for i in range(0, len(logs), frame_size):
+        yield (logs[i : i + frame_size], None)
+    yield (None, b"error")
+
+
+class FakeStream:
+    """A stand-in for docker-py's CancellableStream."""
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        return next(self._iterator)
+
+    def close(self):
+        self.closed = True
+
+
 def make_mock_docker_client():
     """Make a mock docker-py Client object."""
     docker_client = mock.Mock(spec=docker.client.DockerClient)
@@ -103,3 +155,48 @@ def make_test_RunningSession(*args, **kwargs):
     )
 
     return test_session
+
+
+@contextlib.contextmanager
+def fake_http_server(routes):
+    """Run an HTTP server on localhost that answers from `routes`.
+
+    Args:
+        routes (dict): Maps ``(method, path)`` to a callable that takes
+            the request path and returns a ``(status, body)`` tuple.
+            A path of None matches any path. Unrouted requests get 404.
+
+    Yields:
+        int: The port the server listens on.
+
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Send each response in one write, avoiding delayed ACK stalls.
+        wbufsize = -1
+
+        def _respond(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            route = routes.get((self.command, self.path)) or routes.get(
+                (self.command, None)
+            )
+            status, body = route(self.path) if route else (404, b"not found")
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()